@@ -0,0 +1,313 @@
+"""
+Benchmarks for the ``get_config`` resolution path.
+
+Runs locally (no network) and writes results to a JSON file so that runs made on
+different versions of config2py can be compared.
+
+Usage (from the root of the repository)::
+
+    python benchmarks/bench_get_config.py
+    python benchmarks/bench_get_config.py --quick --output /tmp/bench.json
+    python benchmarks/bench_get_config.py --compare benchmarks/results/old.json
+
+Each case is a combination of:
+
+- ``n_sources``: how many sources are chained
+- ``hit_position``: in which source the key is found (``first``, ``middle``, ``last``)
+- ``miss_rate``: fraction of lookups for keys that no source has
+- ``source_kind``: ``mapping`` (dict), ``store`` (in-memory ``SyncStore``, which is
+  versioned) or ``callable`` (function sources)
+- ``cache``: ``none`` (plain ``get_config``) or ``versioned`` (a memo validated with
+  ``sources_version``, which only helps for versioned sources)
+
+For each case, ops/sec, p50 and p99 latency (in microseconds) are reported.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config2py.base import get_config, sources_chainmap, sources_version
+from config2py.sync_store import SyncStore
+from config2py.util import not_found
+
+DFLT_OUTPUT_DIR = Path(__file__).resolve().parent / "results"
+
+N_SOURCES = (1, 4, 16)
+HIT_POSITIONS = ("first", "middle", "last")
+MISS_RATES = (0.0, 0.5, 1.0)
+SOURCE_KINDS = ("mapping", "store", "callable")
+CACHE_MODES = ("none", "versioned")
+KEYS_PER_SOURCE = 100
+
+
+# --------------------------------------------------------------------------------------
+# Fixtures
+
+
+def _mk_source(kind, idx):
+    data = {f"key_{idx}_{i}": i for i in range(KEYS_PER_SOURCE)}
+    if kind == "mapping":
+        return data
+    elif kind == "store":
+        return SyncStore(lambda: dict(data), lambda d: None)
+    elif kind == "callable":
+
+        def getter(k):
+            return data[k]
+
+        return getter
+    raise ValueError(f"Unknown source kind: {kind}")
+
+
+def _hit_index(n_sources, hit_position):
+    return {"first": 0, "middle": n_sources // 2, "last": n_sources - 1}[hit_position]
+
+
+def _mk_keys(n_sources, hit_position, miss_rate, n_keys=256, seed=0):
+    rnd = random.Random(seed)
+    idx = _hit_index(n_sources, hit_position)
+    keys = []
+    for i in range(n_keys):
+        if rnd.random() < miss_rate:
+            keys.append(f"missing_{i}")
+        else:
+            keys.append(f"key_{idx}_{rnd.randrange(KEYS_PER_SOURCE)}")
+    return keys
+
+
+def _versioned_getter(sources):
+    """A memo over ``get_config`` that revalidates with ``sources_version``."""
+    cache = {}
+    state = {"version": None}
+
+    def getter(key):
+        version = sources_version(sources)
+        if version is None or version != state["version"]:
+            cache.clear()
+            state["version"] = version
+        elif key in cache:
+            return cache[key]
+        value = get_config(key, sources, default=None)
+        if version is not None:
+            cache[key] = value
+        return value
+
+    return getter
+
+
+def _mk_resolver(sources, cache):
+    if cache == "none":
+        return lambda key: get_config(key, sources, default=None)
+    elif cache == "versioned":
+        return _versioned_getter(sources)
+    raise ValueError(f"Unknown cache mode: {cache}")
+
+
+# --------------------------------------------------------------------------------------
+# Timing
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def time_calls(func, args, *, min_time=0.2, max_calls=200_000):
+    """Call ``func`` on ``args`` (cycling) for at least ``min_time`` seconds.
+
+    Returns a dict with ``ops_per_sec``, ``p50_us``, ``p99_us`` and ``n_calls``.
+    """
+    perf_counter_ns = time.perf_counter_ns
+    latencies = []
+    append = latencies.append
+    args_cycle = itertools.cycle(args)
+    deadline = perf_counter_ns() + int(min_time * 1e9)
+    total_ns = 0
+    while len(latencies) < max_calls:
+        arg = next(args_cycle)
+        t0 = perf_counter_ns()
+        func(arg)
+        dt = perf_counter_ns() - t0
+        append(dt)
+        total_ns += dt
+        if t0 >= deadline:
+            break
+    latencies.sort()
+    return {
+        "n_calls": len(latencies),
+        "ops_per_sec": len(latencies) / (total_ns / 1e9) if total_ns else float("inf"),
+        "p50_us": _percentile(latencies, 0.50) / 1e3,
+        "p99_us": _percentile(latencies, 0.99) / 1e3,
+    }
+
+
+# --------------------------------------------------------------------------------------
+# Cases
+
+
+def iter_get_config_cases(quick=False):
+    n_sources = (1, 8) if quick else N_SOURCES
+    hit_positions = ("first", "last") if quick else HIT_POSITIONS
+    miss_rates = (0.0, 1.0) if quick else MISS_RATES
+    for n, hit, miss, kind, cache in itertools.product(
+        n_sources, hit_positions, miss_rates, SOURCE_KINDS, CACHE_MODES
+    ):
+        if n == 1 and hit != "first":
+            continue  # all hit positions are the same with a single source
+        yield dict(
+            n_sources=n, hit_position=hit, miss_rate=miss, source_kind=kind, cache=cache
+        )
+
+
+def run_get_config_case(case, *, min_time):
+    sources = [_mk_source(case["source_kind"], i) for i in range(case["n_sources"])]
+    keys = _mk_keys(case["n_sources"], case["hit_position"], case["miss_rate"])
+    resolver = _mk_resolver(sources, case["cache"])
+    return time_calls(resolver, keys, min_time=min_time)
+
+
+def run_sources_chainmap_case(case, *, min_time):
+    sources = [_mk_source(case["source_kind"], i) for i in range(case["n_sources"])]
+    keys = _mk_keys(case["n_sources"], "last", 0.0)
+
+    def build_and_get(key):
+        return sources_chainmap(sources).get(key, not_found)
+
+    return time_calls(build_and_get, keys, min_time=min_time)
+
+
+def iter_sources_chainmap_cases(quick=False):
+    n_sources = (1, 8) if quick else N_SOURCES
+    for n, kind in itertools.product(n_sources, SOURCE_KINDS):
+        yield dict(n_sources=n, source_kind=kind)
+
+
+def _case_id(bench, case):
+    return bench + "[" + ",".join(f"{k}={v}" for k, v in case.items()) + "]"
+
+
+# --------------------------------------------------------------------------------------
+# Running, reporting and comparing
+
+
+def _environment_info():
+    try:
+        from importlib.metadata import version
+
+        config2py_version = version("config2py")
+    except Exception:
+        config2py_version = "unknown"
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=Path(__file__).resolve().parent,
+            timeout=5,
+        ).stdout.strip()
+    except Exception:
+        commit = ""
+    return {
+        "config2py_version": config2py_version,
+        "git_commit": commit or None,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def run_benchmarks(*, quick=False, min_time=0.2, verbose=True):
+    """Run all benchmark cases and return the results as a JSON-friendly dict."""
+    benches = [
+        ("get_config", iter_get_config_cases, run_get_config_case),
+        ("sources_chainmap", iter_sources_chainmap_cases, run_sources_chainmap_case),
+    ]
+    results = []
+    for bench, iter_cases, run_case in benches:
+        for case in iter_cases(quick):
+            stats = run_case(case, min_time=min_time)
+            case_id = _case_id(bench, case)
+            results.append(dict(id=case_id, bench=bench, params=case, **stats))
+            if verbose:
+                print(
+                    f"{case_id:<95} {stats['ops_per_sec']:>12,.0f} ops/s  "
+                    f"p50={stats['p50_us']:8.2f}us  p99={stats['p99_us']:8.2f}us"
+                )
+    return {"environment": _environment_info(), "results": results}
+
+
+def compare(new, old, *, threshold=0.10):
+    """Print the ops/sec ratio of ``new`` over ``old`` results, flagging regressions.
+
+    Returns the list of case ids that regressed by more than ``threshold``.
+    """
+    old_by_id = {r["id"]: r for r in old["results"]}
+    regressions = []
+    for r in new["results"]:
+        o = old_by_id.get(r["id"])
+        if o is None:
+            continue
+        ratio = r["ops_per_sec"] / o["ops_per_sec"]
+        flag = ""
+        if ratio < 1 - threshold:
+            flag = "  <-- regression"
+            regressions.append(r["id"])
+        print(f"{r['id']:<95} x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def _dflt_output_path(environment):
+    name = f"get_config-{environment['config2py_version']}"
+    if environment["git_commit"]:
+        name += f"-{environment['git_commit']}"
+    return DFLT_OUTPUT_DIR / f"{name}.json"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--output", "-o", help="Path of the JSON results file")
+    parser.add_argument(
+        "--quick", action="store_true", help="Run a reduced set of cases"
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="Minimum time (in seconds) spent on each case",
+    )
+    parser.add_argument(
+        "--compare", help="Path of a previous JSON results file to compare against"
+    )
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(quick=args.quick, min_time=args.min_time)
+    output = (
+        Path(args.output) if args.output else _dflt_output_path(report["environment"])
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults written to {os.fspath(output)}")
+
+    if args.compare:
+        print(f"\nComparison with {args.compare} (ops/sec ratio, new / old):")
+        old = json.loads(Path(args.compare).read_text())
+        if compare(report, old):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -25,5 +25,36 @@ from config2py.util import (
     ensure_seeded,
     AppData,
 )
-from config2py.sync_store import SyncStore, FileStore, JsonStore, register_extension
+from config2py.sync_store import (
+    SyncStore,
+    FileStore,
+    JsonStore,
+    JournalStore,
+    register_extension,
+)
 from config2py import codecs  # noqa - Make codecs module available
+
+# Imported on first access, so that ``import config2py`` doesn't pay for what they
+# import (asyncio, concurrent.futures, sqlite3...)
+_lazy_exports = {
+    "SqliteStore": "config2py.sqlite_store",
+    "DirectoryStore": "config2py.directory_store",
+    "AsyncSyncStore": "config2py.async_store",
+    "AsyncFileStore": "config2py.async_store",
+    "AsyncJsonStore": "config2py.async_store",
+    "ParseCache": "config2py.parse_cache",
+}
+
+
+def __getattr__(name):
+    if name in _lazy_exports:
+        import importlib
+
+        value = getattr(importlib.import_module(_lazy_exports[name]), name)
+        globals()[name] = value  # So later accesses don't come back here
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _lazy_exports.keys())
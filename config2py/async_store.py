@@ -0,0 +1,209 @@
+"""Asyncio variants of the stores of ``sync_store``.
+
+Calling a ``FileStore`` from a coroutine blocks the event loop for every read or
+write of the file. The stores here add coroutine methods (``aget``, ``aset``,
+``adel``, ``aupdate``, ``aflush``...) that run the file I/O in a thread executor, and
+support ``async with`` batches:
+
+>>> import asyncio
+>>> saved = []
+>>> store = AsyncSyncStore(dict, lambda data: saved.append(dict(data)))
+>>> async def main():
+...     await store.aset('a', 1)
+...     async with store:
+...         await store.aset('b', 2)
+...         await store.adel('a')
+...     return await store.aget('b')
+>>> asyncio.run(main())
+2
+>>> saved
+[{'a': 1}, {'b': 2}]
+
+Mutations and flushes of a file are serialized by an ``asyncio.Lock`` shared by all
+the async stores of that file (in an event loop), so concurrent coroutines can't
+interleave their writes, and never wait on a lock held by a flush in progress while
+blocking the loop. Mixing them with blocking calls (``store[k] = v``) from the event
+loop thread defeats this: use the coroutine methods there.
+"""
+
+import asyncio
+import os
+import weakref
+from functools import partial
+from typing import Any, Optional
+from concurrent.futures import Executor
+
+from config2py.sync_store import SyncStore, FileStore, JsonStore
+
+__all__ = ["AsyncStoreMixin", "AsyncSyncStore", "AsyncFileStore", "AsyncJsonStore"]
+
+# Per event loop, the lock of each file (or store), alive as long as it's used
+_async_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _async_lock(key) -> asyncio.Lock:
+    locks = _async_locks.setdefault(
+        asyncio.get_running_loop(), weakref.WeakValueDictionary()
+    )
+    lock = locks.get(key)
+    if lock is None:
+        lock = locks[key] = asyncio.Lock()
+    return lock
+
+
+class AsyncStoreMixin:
+    """Coroutine methods for ``SyncStore`` classes, offloading I/O to an executor.
+
+    Async stores are lazy by default (constructing them doesn't read anything): the
+    data is loaded, in the executor, by ``aload()`` or the first coroutine method
+    used.
+
+    With a ``flush_delay``, flushes are left to the background flusher thread, as
+    for the blocking stores.
+
+    Args:
+        executor: The ``concurrent.futures`` executor to run I/O in. Defaults to the
+            event loop's default executor.
+    """
+
+    def __init__(
+        self, *args, lazy: bool = True, executor: Optional[Executor] = None, **kwargs
+    ):
+        self.executor = executor
+        super().__init__(*args, lazy=lazy, **kwargs)
+        self._async_lock_key = self._mk_async_lock_key()
+
+    def _mk_async_lock_key(self):
+        """Stores with the same key share their async lock (default: none do)."""
+        return id(self)
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args))
+
+    async def aload(self):
+        """Load the data (in the executor) if it wasn't yet."""
+        if self._data is None:
+            async with _async_lock(self._async_lock_key):
+                await self._run(self._ensure_loaded)
+
+    async def aget(self, key, default=None):
+        """Return the value of ``key`` (or ``default``), loading the data if needed.
+
+        Reads are served from memory, without checking whether the backing storage
+        changed: use ``arefresh()`` (or ``watch=True``) to pick up external changes.
+        """
+        await self.aload()
+        try:
+            return self._get_item(key)
+        except KeyError:
+            return default
+
+    async def acontains(self, key) -> bool:
+        """Return whether ``key`` is in the store, loading the data if needed."""
+        await self.aload()
+        return self._has_item(key)
+
+    async def aset(self, key, value):
+        """Set ``key`` to ``value``, syncing (in the executor) unless in a batch."""
+        await self._amutate(self._set_item, key, value)
+
+    async def adel(self, key):
+        """Delete ``key``, syncing (in the executor) unless in a batch."""
+        await self._amutate(self._del_item, key)
+
+    async def aupdate(self, other=(), /, **kwds):
+        """Update the store from a mapping or iterable of pairs, syncing once."""
+        items = dict(other, **kwds)
+
+        def set_items():
+            for key, value in items.items():
+                self._set_item(key, value)
+
+        if items:
+            await self._amutate(set_items)
+
+    async def _amutate(self, mutate, *args):
+        """Apply ``mutate(*args)`` and sync like ``_mark_dirty`` would, in the executor.
+
+        All of it runs there: taking the store's (threading) lock, which a background
+        flush may hold, and flushing (when ``max_pending`` is reached, say) would
+        block the event loop.
+        """
+        await self.aload()
+
+        def mutate_and_sync():
+            with self._lock:
+                mutate(*args)
+                self._mark_dirty()
+
+        async with _async_lock(self._async_lock_key):
+            await self._run(mutate_and_sync)
+
+    async def aflush(self):
+        """Sync data to backing storage (in the executor) if changes exist."""
+        async with _async_lock(self._async_lock_key):
+            await self._run(self.flush)
+
+    async def areload(self):
+        """Reload data from backing storage (in the executor), discarding changes."""
+        async with _async_lock(self._async_lock_key):
+            await self._run(self.reload)
+
+    async def __aenter__(self):
+        """Enter deferred sync mode: changes are flushed when the batch exits.
+
+        Async batches are always shared: the coroutines of the event loop run in the
+        same thread, so there's no thread to scope them to.
+        """
+        await self._run(self._add_to_batch_depth, 1)
+        return self
+
+    async def __aexit__(self, *args):
+        if await self._run(self._add_to_batch_depth, -1) == 0:
+            await self.aflush()
+
+    def _add_to_batch_depth(self, increment: int) -> int:
+        with self._lock:
+            self._batch_depth += increment
+            return self._batch_depth
+
+
+class AsyncSyncStore(AsyncStoreMixin, SyncStore):
+    """A ``SyncStore`` with coroutine methods running its loader and dumper in an
+    executor (see ``AsyncStoreMixin``)."""
+
+
+class AsyncFileStore(AsyncStoreMixin, FileStore):
+    """A ``FileStore`` with coroutine methods running file I/O in an executor.
+
+    All the async stores of a file (in an event loop) share a lock, so their writes
+    never interleave.
+
+    >>> import asyncio, json, os, tempfile
+    >>> filepath = os.path.join(tempfile.mkdtemp(), 'config.json')
+    >>> async def main():
+    ...     store = AsyncFileStore(filepath, create_file_content=dict)
+    ...     await asyncio.gather(*(store.aset(f'k{i}', i) for i in range(3)))
+    >>> asyncio.run(main())
+    >>> json.load(open(filepath)) == {'k0': 0, 'k1': 1, 'k2': 2}  # (in any order)
+    True
+    """
+
+    def _mk_async_lock_key(self):
+        return os.path.realpath(self.filepath)
+
+    async def arefresh(self) -> bool:
+        """Reload the file (in the executor) if it changed on disk.
+
+        Returns True if the store was reloaded (see ``FileStore.refresh``).
+        """
+        async with _async_lock(self._async_lock_key):
+            return await self._run(self.refresh)
+
+
+class AsyncJsonStore(AsyncFileStore, JsonStore):
+    """A ``JsonStore`` with coroutine methods running file I/O in an executor (see
+    ``AsyncFileStore``)."""
@@ -14,9 +14,10 @@ from typing import (
     runtime_checkable,
     Optional,
 )
-from collections.abc import Callable, Iterable, MutableMapping
+from collections.abc import Callable, Iterable, MutableMapping, Hashable
 from dataclasses import dataclass
 from functools import lru_cache, partial
+import os
 
 from config2py.util import always_true, ask_user_for_input, no_default, not_found
 from config2py.errors import ConfigNotFound
@@ -78,6 +79,108 @@ Getter = Callable[[KT], VT]
 Sources = Iterable[Union[GettableContainer, Getter]]
 GetConfigEgress = Callable[[KT, VT], VT]
 
+
+@runtime_checkable
+class Versioned(Protocol):
+    """Sources that can cheaply tell whether they (may) have changed.
+
+    ``version()`` returns a hashable token. If two calls return equal tokens, the
+    source's contents didn't change in between, so anything computed from it
+    (e.g. a cached config value) is still valid. (For file-based sources, "changed"
+    is judged from file stat signatures, so it's as precise as the modification
+    times of the file system.)
+    config2py's own stores (``SyncStore``, ``FileStore``, ``ConfigStore``, ``envvar``)
+    implement it.
+    """
+
+    def version(self) -> Hashable:
+        pass
+
+
+def source_version(src) -> Optional[Hashable]:
+    """Get the version token of a source, or ``None`` if it can't provide one.
+
+    Sources implementing ``Versioned`` are asked directly. Folder-based stores
+    (like ``dol.TextFiles``, which have a ``rootdir``) get the stat signatures of
+    the files under their folder (see ``folder_signature``, whose cost grows with
+    the number of files).
+
+    >>> from config2py.sync_store import SyncStore
+    >>> store = SyncStore(dict, lambda d: None)
+    >>> v = source_version(store)
+    >>> store['a'] = 1
+    >>> source_version(store) != v
+    True
+    >>> source_version({'a': 1}) is None  # a plain dict has no version
+    True
+    """
+    version = getattr(src, "version", None)
+    if callable(version):
+        return version()
+    rootdir = getattr(src, "rootdir", None)
+    if isinstance(rootdir, str) and os.path.isdir(rootdir):
+        return folder_signature(rootdir)
+    return None
+
+
+def folder_signature(rootdir: str) -> frozenset:
+    """The ``(relative path, mtime_ns, size, inode)`` signatures of the files under
+    ``rootdir``.
+
+    A folder's own modification time only changes when entries are added or
+    removed, so it can't tell that an existing file was overwritten: the signatures
+    of the files can.
+
+    Computing it walks the whole tree and stats every file, on every call: for
+    folders of many files (or deep trees), that can cost more than re-reading the
+    few values a cache validated with it would save. Use a source that maintains
+    its own ``version`` (a ``Versioned`` one) for those.
+
+    >>> import tempfile
+    >>> rootdir = tempfile.mkdtemp()
+    >>> filepath = os.path.join(rootdir, 'k')
+    >>> with open(filepath, 'w') as f:
+    ...     _ = f.write('v1')
+    >>> sig = folder_signature(rootdir)
+    >>> os.utime(filepath, ns=(1, 1))  # e.g. rewritten, with the same size
+    >>> folder_signature(rootdir) != sig
+    True
+    """
+    entries = []
+    for dirpath, _, filenames in os.walk(rootdir):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:  # Removed while we walked
+                continue
+            relpath = os.path.relpath(path, rootdir)
+            entries.append((relpath, st.st_mtime_ns, st.st_size, st.st_ino))
+    return frozenset(entries)
+
+
+def sources_version(sources: Sources) -> Optional[tuple]:
+    """Get a combined version token for several sources.
+
+    Returns ``None`` if any of the sources is not versioned (in which case a cache
+    can't validate itself cheaply and should refetch).
+
+    >>> from config2py.sync_store import SyncStore
+    >>> store = SyncStore(dict, lambda d: None)
+    >>> sources_version([store, store]) == (1, 1)
+    True
+    >>> sources_version([store, {'a': 1}]) is None
+    True
+    """
+    tokens = []
+    for src in sources:
+        token = source_version(src)
+        if token is None:
+            return None
+        tokens.append(token)
+    return tuple(tokens)
+
+
 # # TODO: Refactor into reusable function that can look (and write) in multiple stores
 # _open_api_key_env_name = 'OPENAI_API_KEY'
 # _api_key = os.environ.get(_open_api_key_env_name, None)
@@ -29,17 +29,21 @@ and conditionally registers codecs that require third-party libraries (yaml, jso
 """
 
 from typing import Callable, TypeVar, Any, Optional
+import importlib
 import json
+import os
 import pickle
 import csv
 import io
 from configparser import ConfigParser
 from pathlib import Path
+from functools import partial
 
 __all__ = [
     # Core functions
     "decode_by_extension",
     "encode_by_extension",
+    "decode_file",
     "get_extension",
     # Registration functions
     "register_codec",
@@ -122,6 +126,9 @@ def decode_by_extension(key: str, data: bytes) -> Any:
     ext = get_extension(key)
     ext_with_dot = f".{ext}" if ext else ""
     decoder = EXTENSION_TO_DECODER.get(ext_with_dot)
+    if decoder is None and (compressed := _compressed_inner_key(key)) is not None:
+        inner_key, module = compressed
+        return decode_by_extension(inner_key, module.decompress(data))
     if decoder is None:
         available = ", ".join(sorted(EXTENSION_TO_DECODER.keys()))
         raise ValueError(
@@ -131,12 +138,16 @@ def decode_by_extension(key: str, data: bytes) -> Any:
     return decoder(data)
 
 
-def encode_by_extension(key: str, obj: Any) -> bytes:
+def encode_by_extension(
+    key: str, obj: Any, *, compression_level: Optional[int] = None
+) -> bytes:
     """Encode object based on key's extension.
 
     Args:
         key: Key or filename with extension
         obj: Python object to encode
+        compression_level: Level used when the key has a compression suffix
+            (e.g. ``config.json.gz``). ``None`` uses the compressor's default.
 
     Returns:
         Encoded bytes
@@ -152,6 +163,9 @@ def encode_by_extension(key: str, obj: Any) -> bytes:
     ext = get_extension(key)
     ext_with_dot = f".{ext}" if ext else ""
     encoder = EXTENSION_TO_ENCODER.get(ext_with_dot)
+    if encoder is None and (compressed := _compressed_inner_key(key)) is not None:
+        inner_key, module = compressed
+        return _compress(module, encode_by_extension(inner_key, obj), compression_level)
     if encoder is None:
         available = ", ".join(sorted(EXTENSION_TO_ENCODER.keys()))
         raise ValueError(
@@ -161,6 +175,84 @@ def encode_by_extension(key: str, obj: Any) -> bytes:
     return encoder(obj)
 
 
+def decode_file(filepath, *, parse_cache=None) -> Any:
+    """Decode the file at ``filepath`` based on its extension.
+
+    Args:
+        filepath: Path of the file to decode
+        parse_cache: A ``config2py.parse_cache.ParseCache`` to load the decoded object
+            from (and save it to) when the file didn't change since it was cached.
+            ``True`` uses the default parse cache, under the ``cache`` app folder.
+
+    Returns:
+        Decoded Python object
+
+    Examples:
+        >>> import tempfile, os
+        >>> filepath = os.path.join(tempfile.mkdtemp(), 'config.json')
+        >>> with open(filepath, 'wb') as f:
+        ...     _ = f.write(b'{"key": "value"}')
+        >>> decode_file(filepath)
+        {'key': 'value'}
+    """
+    filepath = os.fspath(filepath)
+    if not parse_cache:
+        return decode_by_extension(filepath, Path(filepath).read_bytes())
+    from config2py.parse_cache import codec_version, default_parse_cache
+
+    if parse_cache is True:
+        parse_cache = default_parse_cache()
+    # The entries must be invalidated if the decoder actually parsing the file changes
+    key = filepath
+    while (decoder := EXTENSION_TO_DECODER.get(f".{get_extension(key)}")) is None:
+        compressed = _compressed_inner_key(key)
+        if compressed is None:
+            decoder = decode_by_extension  # (will raise the missing decoder error)
+            break
+        key, _ = compressed
+    return parse_cache.load(
+        filepath,
+        partial(decode_by_extension, filepath),
+        read=lambda path: Path(path).read_bytes(),
+        version=f"{get_extension(filepath)}:{codec_version(decoder)}",
+    )
+
+
+# Compressed files (e.g. ``config.json.gz``) are handled by decompressing the data and
+# decoding it with the codec of the inner extension, unless a codec is registered for
+# the compression extension itself. Values are the names of the stdlib modules used.
+COMPRESSION_EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "lzma"}
+
+
+def _compressed_inner_key(key: str):
+    """Return ``(inner_key, compression_module)`` if ``key`` names a compressed file.
+
+    >>> inner_key, module = _compressed_inner_key('config.json.gz')
+    >>> inner_key, module.__name__
+    ('config.json', 'gzip')
+    >>> _compressed_inner_key('config.json') is None
+    True
+    """
+    ext = get_extension(key)
+    compression = COMPRESSION_EXTENSIONS.get(f".{ext}" if ext else "")
+    if compression is None:
+        return None
+    inner_key = key[: -(len(ext) + 1)]
+    if not get_extension(inner_key):
+        return None
+    return inner_key, importlib.import_module(compression)
+
+
+def _compress(module, data: bytes, level: Optional[int] = None) -> bytes:
+    kwargs = {}
+    if level is not None:
+        level_kwarg = "preset" if module.__name__ == "lzma" else "compresslevel"
+        kwargs[level_kwarg] = level
+    if module.__name__ == "gzip":
+        kwargs["mtime"] = 0  # so that equal content gives equal bytes
+    return module.compress(data, **kwargs)
+
+
 # --------------------------------------------------------------------------------------
 # Registration Functions
 # --------------------------------------------------------------------------------------
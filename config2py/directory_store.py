@@ -0,0 +1,261 @@
+"""A store merging the configuration files of a directory into one mapping."""
+
+import threading
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Union
+
+from config2py.sync_store import FileStore, get_format_handlers
+
+__all__ = ["DirectoryStore"]
+
+
+class DirectoryStore(MutableMapping):
+    """
+    A MutableMapping merging the files of a directory (e.g. ``conf.d/``) into one.
+
+    Each file (with a registered extension) is a ``FileStore``, and files are loaded
+    in parallel, in a thread pool. When several files have a key, the file coming
+    last in the precedence order wins: by default, the order of file names, so
+    ``conf.d/50-local.yaml`` overrides ``conf.d/10-defaults.json``.
+
+    Writes go to the file owning the key (the one its value comes from), and new keys
+    go to ``default_file`` (by default, the file with the highest precedence).
+    Deleting a key deletes it from every file that has it, so that no file's value
+    shows through. ``with`` blocks batch the changes of all the files, writing each
+    changed file once, on exit of the outermost block.
+
+    ``refresh()`` picks up changes made on disk: files whose ``(mtime_ns, size,
+    inode)`` signature changed are re-parsed (and only those), and files added to or
+    removed from the directory are added or dropped.
+
+    Args:
+        dirpath: The directory (supports ~ expansion)
+        pattern: Glob pattern selecting the files of the directory (default: all
+            the files with a registered extension). Hidden files are ignored.
+        sort_key: Key sorting the file paths in increasing order of precedence
+            (default: their names)
+        default_file: Name of the file new keys are written to, created (empty) if
+            it doesn't exist. Required if the directory has no files.
+        max_workers: Maximum number of threads used to load files
+        **file_store_kwargs: Passed on to the ``FileStore`` of each file
+
+    Example:
+        >>> import os, tempfile
+        >>> with tempfile.TemporaryDirectory() as tmpdir:
+        ...     with open(os.path.join(tmpdir, '10-defaults.json'), 'w') as f:
+        ...         _ = f.write('{"host": "localhost", "port": 8080}')
+        ...     with open(os.path.join(tmpdir, '50-local.json'), 'w') as f:
+        ...         _ = f.write('{"port": 9000}')
+        ...     store = DirectoryStore(tmpdir)
+        ...     print(dict(store))
+        ...     store['host'] = 'example.com'  # Written to 10-defaults.json
+        ...     print(FileStore(os.path.join(tmpdir, '10-defaults.json'))['host'])
+        {'host': 'localhost', 'port': 9000}
+        example.com
+    """
+
+    def __init__(
+        self,
+        dirpath: Union[str, Path],
+        pattern: str = "*",
+        *,
+        sort_key: Optional[Callable[[Path], Any]] = None,
+        default_file: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        **file_store_kwargs,
+    ):
+        reserved = file_store_kwargs.keys() & {"lazy", "create_file_content"}
+        if reserved:
+            raise TypeError(
+                f"DirectoryStore manages {', '.join(sorted(reserved))} of its files "
+                "itself: don't pass them"
+            )
+        self.dirpath = Path(dirpath).expanduser()
+        self.pattern = pattern
+        self.sort_key = sort_key or (lambda path: path.name)
+        self.default_file = default_file
+        self.max_workers = max_workers
+        self.file_store_kwargs = file_store_kwargs
+        self.stats = {"loads": 0}
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._batch_stack = None
+        self.stores: Dict[Path, FileStore] = {}
+        self._owners: Dict[Any, FileStore] = {}
+        self._version = 0
+        created = None
+        if default_file is not None:
+            path = self.dirpath / default_file
+            if not self._selects(path):
+                raise ValueError(
+                    f"default_file {default_file!r} isn't one of the files of the "
+                    f"store (pattern {pattern!r}, with a registered extension)"
+                )
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                FileStore(path, create_file_content=dict, **file_store_kwargs)
+                created = path
+        self.refresh()
+        if default_file is not None and self.dirpath / default_file not in self.stores:
+            if created is not None:
+                created.unlink()
+            raise ValueError(
+                f"default_file {default_file!r} doesn't match pattern {pattern!r}"
+            )
+
+    def _selects(self, path: Path) -> bool:
+        """Whether ``path`` can be one of the files of the store."""
+        return (
+            not path.name.startswith(".")
+            and get_format_handlers(path) is not None
+            and path.relative_to(self.dirpath).match(self.pattern)
+        )
+
+    def _scan(self) -> list:
+        """The paths of the directory's files, in increasing order of precedence."""
+        paths = (
+            path
+            for path in self.dirpath.glob(self.pattern)
+            if path.is_file() and self._selects(path)
+        )
+        return sorted(paths, key=self.sort_key)
+
+    def _map(self, func, stores):
+        """Apply ``func`` to ``stores`` in a thread pool, returning the results."""
+        stores = list(stores)
+        if len(stores) <= 1:
+            return [func(store) for store in stores]
+        with ThreadPoolExecutor(self.max_workers) as executor:
+            return list(executor.map(func, stores))
+
+    def refresh(self) -> bool:
+        """Pick up changes made on disk, re-parsing only the files that changed.
+
+        Returns True if anything changed. Nothing is reloaded while there are
+        unflushed changes (see ``FileStore.refresh``).
+        """
+        with self._lock:
+            paths = self._scan()
+            new_stores = {
+                path: self.stores.get(path)
+                or FileStore(path, lazy=True, **self.file_store_kwargs)
+                for path in paths
+            }
+            added = [store for store in new_stores.values() if store._data is None]
+            changed = len(added) > 0 or new_stores.keys() != self.stores.keys()
+            existing = [
+                store for store in new_stores.values() if store._data is not None
+            ]
+            self._map(FileStore._ensure_loaded, added)
+            self.stats["loads"] += len(added)
+            reloaded = sum(self._map(FileStore.refresh, existing))
+            self.stats["loads"] += reloaded
+            if self._batch_stack is not None:
+                for store in added:
+                    self._batch_stack.enter_context(store)
+            self.stores = new_stores
+            if changed or reloaded:
+                self._merge_owners()
+                return True
+            return False
+
+    def _merge_owners(self):
+        """Recompute which file owns (i.e. gives the value of) each key."""
+        self._owners = {
+            key: store for store in self.stores.values() for key in store._data
+        }
+        self._version += 1
+
+    def _default_store(self) -> FileStore:
+        if self.default_file is not None:
+            return self.stores[self.dirpath / self.default_file]
+        if not self.stores:
+            raise KeyError(f"No files in {self.dirpath} (and no default_file)")
+        return next(reversed(self.stores.values()))
+
+    def owner(self, key) -> Path:
+        """Return the path of the file the value of ``key`` comes from."""
+        return self._owners[key].filepath
+
+    def __getitem__(self, key):
+        return self._owners[key][key]
+
+    def __contains__(self, key):
+        return key in self._owners
+
+    def __iter__(self) -> Iterator:
+        return iter(list(self._owners))
+
+    def __len__(self):
+        return len(self._owners)
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            store = self._owners.get(key)
+            if store is None:
+                store = self._default_store()
+            store[key] = value
+            self._owners[key] = store
+            self._version += 1
+
+    def __delitem__(self, key):
+        with self._lock:
+            if key not in self._owners:
+                raise KeyError(key)
+            for store in self.stores.values():
+                if key in store:
+                    del store[key]
+            del self._owners[key]
+            self._version += 1
+
+    def update(self, other=(), /, **kwds):
+        """Update from a mapping or iterable of pairs, writing each file once."""
+        with self:
+            super().update(other, **kwds)
+
+    def clear(self):
+        """Remove all items, writing each file once."""
+        with self:
+            super().clear()
+
+    def __enter__(self):
+        """Enter deferred sync mode, for all the files."""
+        with self._lock:
+            self._batch_depth += 1
+            if self._batch_depth == 1:
+                stack = ExitStack()
+                for store in self.stores.values():
+                    stack.enter_context(store)
+                self._batch_stack = stack
+        return self
+
+    def __exit__(self, *args):
+        """Exit deferred sync mode, writing the changed files if leaving the
+        outermost batch."""
+        with self._lock:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                stack, self._batch_stack = self._batch_stack, None
+                stack.close()
+
+    def flush(self):
+        """Write the files that have unflushed changes."""
+        with self._lock:
+            for store in self.stores.values():
+                store.flush()
+
+    def version(self):
+        """Return a token that changes whenever the store's contents (may) change.
+
+        Combines the versions of the files (see ``FileStore.version``), so it also
+        changes when a file changes on disk.
+        """
+        with self._lock:
+            return (self._version, tuple(s.version() for s in self.stores.values()))
+
+    def __repr__(self):
+        pattern_str = f", {self.pattern!r}" if self.pattern != "*" else ""
+        return f"{self.__class__.__name__}({self.dirpath!r}{pattern_str})"
@@ -0,0 +1,227 @@
+"""A disk cache of parsed configuration files.
+
+Parsing YAML (and to a lesser extent TOML or INI) is slow compared to loading the same
+object from a binary serialization. A ``ParseCache`` keeps the decoded object of each
+file in a cache folder (by default, the ``cache`` app folder of config2py), keyed by the
+file's path, signature (modification time and size) and the version of the codec that
+parsed it. As long as the file doesn't change, it's loaded from the cache.
+
+Examples:
+    >>> import os, tempfile, json
+    >>> tmpdir = tempfile.mkdtemp()
+    >>> filepath = os.path.join(tmpdir, 'config.json')
+    >>> with open(filepath, 'w') as f:
+    ...     _ = f.write('{"a": 1}')
+    >>> cache = ParseCache(os.path.join(tmpdir, 'cache'))
+    >>> cache.load(filepath, json.loads, read=lambda p: open(p).read())
+    {'a': 1}
+    >>> cache.stats['misses'], cache.stats['hits']
+    (1, 0)
+    >>> cache.load(filepath, json.loads, read=lambda p: open(p).read())
+    {'a': 1}
+    >>> cache.stats['misses'], cache.stats['hits']
+    (1, 1)
+
+Cached objects are serialized with ``marshal`` when they only contain core types, and
+with ``pickle`` otherwise, so the cache folder must only be writable by you (as is the
+case for the default one).
+"""
+
+import hashlib
+import marshal
+import os
+import pickle
+import platform
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+DFLT_PARSE_CACHE_APP_NAME = "config2py/parse_cache"
+
+_MARSHAL, _PICKLE = b"m", b"p"
+_FORMAT_VERSION = 1  # Bump to invalidate all entries if the layout changes
+_miss = object()
+
+
+def codec_version(codec: Union[str, Callable]) -> str:
+    """Return a string that changes whenever ``codec`` may parse differently.
+
+    Strings are taken as versions as is. For functions, the version combines their
+    qualified name, a digest of their code, the ``__version__`` of their top level
+    package (if any) and the python version.
+
+    >>> import json
+    >>> codec_version(json.loads) == codec_version(json.loads)
+    True
+    >>> codec_version(json.loads) == codec_version(json.dumps)
+    False
+    >>> codec_version('my_codec-1.2')
+    'my_codec-1.2'
+    """
+    if isinstance(codec, str):
+        return codec
+    module_name = getattr(codec, "__module__", None) or ""
+    package = sys.modules.get(module_name.partition(".")[0])
+    code = getattr(codec, "__code__", None)
+    h = hashlib.blake2b(digest_size=16)
+    for part in (
+        module_name,
+        getattr(codec, "__qualname__", repr(codec)),
+        str(getattr(package, "__version__", "")),
+        platform.python_version(),
+        str(_FORMAT_VERSION),
+    ):
+        h.update(part.encode() + b"\0")
+    if code is not None:
+        h.update(code.co_code)
+        h.update(repr(code.co_consts).encode())
+    return h.hexdigest()
+
+
+def _stat_key(filepath) -> Optional[tuple]:
+    """Return ``(mtime_ns, size)`` of ``filepath``, or None if it doesn't exist."""
+    try:
+        st = os.stat(filepath)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _dflt_rootdir() -> str:
+    from config2py.util import get_app_folder
+
+    return get_app_folder(DFLT_PARSE_CACHE_APP_NAME, folder_kind="cache")
+
+
+def _serialize(key: tuple, value: Any) -> bytes:
+    try:
+        return _MARSHAL + marshal.dumps((key, value))
+    except ValueError:  # Not only core types
+        return _PICKLE + pickle.dumps((key, value), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _deserialize(blob: bytes) -> tuple:
+    fmt, payload = blob[:1], blob[1:]
+    if fmt == _MARSHAL:
+        return marshal.loads(payload)
+    elif fmt == _PICKLE:
+        return pickle.loads(payload)
+    raise ValueError(f"Unknown cache entry format: {fmt!r}")
+
+
+_default_parse_cache = None
+
+
+def default_parse_cache() -> "ParseCache":
+    """Return the (shared) parse cache in the default cache folder."""
+    global _default_parse_cache
+    if _default_parse_cache is None:
+        _default_parse_cache = ParseCache()
+    return _default_parse_cache
+
+
+class ParseCache:
+    """Cache parsed files on disk, keyed by path, signature and codec version.
+
+    Each file gets one entry (a new version of the file replaces the entry of the
+    previous one). Entries are written atomically, and a corrupt or unreadable entry is
+    treated as a miss: the cache is an optimization, never a source of errors.
+
+    Args:
+        rootdir: Folder of the cache entries. Defaults to the config2py parse cache
+            folder, under the ``cache`` app folder kind.
+    """
+
+    def __init__(self, rootdir: Optional[Union[str, Path]] = None):
+        self._rootdir = rootdir
+        self.stats = {"hits": 0, "misses": 0}
+
+    @property
+    def rootdir(self) -> Path:
+        if self._rootdir is None:
+            self._rootdir = _dflt_rootdir()
+        return Path(self._rootdir)
+
+    def _entry_path(self, filepath) -> Path:
+        realpath = os.path.realpath(filepath)
+        name = hashlib.blake2b(realpath.encode(), digest_size=16).hexdigest()
+        return self.rootdir / f"{name}.cache"
+
+    @staticmethod
+    def _key(filepath, signature, codec) -> tuple:
+        return (os.path.realpath(filepath), tuple(signature), codec_version(codec))
+
+    def get(self, filepath, signature, codec, default=None) -> Any:
+        """Return the cached value for this version of ``filepath``, or ``default``.
+
+        Args:
+            filepath: Path of the parsed file.
+            signature: Stat signature of the file when it was read (e.g.
+                ``sync_store.file_signature``).
+            codec: The function that parsed the file (or a version string for it).
+            default: Returned when there's no valid entry.
+        """
+        try:
+            blob = self._entry_path(filepath).read_bytes()
+            key, value = _deserialize(blob)
+        except Exception:  # Missing, corrupt, or from an incompatible python
+            self.stats["misses"] += 1
+            return default
+        if key != self._key(filepath, signature, codec):
+            self.stats["misses"] += 1
+            return default
+        self.stats["hits"] += 1
+        return value
+
+    def set(self, filepath, signature, codec, value) -> bool:
+        """Cache ``value`` as the parse of ``filepath`` (returns False if it couldn't)."""
+        entry_path = self._entry_path(filepath)
+        try:
+            blob = _serialize(self._key(filepath, signature, codec), value)
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=entry_path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(blob)
+                os.replace(tmp_path, entry_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            return False
+        return True
+
+    def load(
+        self,
+        filepath,
+        codec: Callable[[Any], Any],
+        *,
+        read: Callable[[str], Any],
+        version: Optional[str] = None,
+    ) -> Any:
+        """Return ``codec(read(filepath))``, from the cache if the file didn't change.
+
+        Args:
+            filepath: Path of the file to load.
+            codec: Function parsing the content returned by ``read``.
+            read: Function returning the content of the file, given its path.
+            version: Version of the codec, if ``codec`` is a wrapper whose own version
+                wouldn't change with the parser it wraps.
+        """
+        version = version or codec
+        signature = _stat_key(filepath)
+        if signature is not None:
+            value = self.get(filepath, signature, version, default=_miss)
+            if value is not _miss:
+                return value
+        value = codec(read(filepath))
+        # Only cache what we parsed if the file didn't change while we were reading it
+        if signature is not None and signature == _stat_key(filepath):
+            self.set(filepath, signature, version, value)
+        return value
+
+    def clear(self):
+        """Delete all the entries of the cache."""
+        for entry_path in self.rootdir.glob("*.cache"):
+            entry_path.unlink(missing_ok=True)
@@ -9,6 +9,8 @@ from io import StringIO
 
 from dol import Store
 
+from config2py.sync_store import file_signature
+
 # from py2store.signatures import Sig
 
 _test_config_str = """[Simple Values]
@@ -218,6 +220,7 @@ class ConfigStore(ConfigParserStore):
         target_kind=None,
         **more_config_parser_kwargs,
     ):
+        self._mutations = 0
         super().__init__(
             defaults, dict_type, allow_no_value, **more_config_parser_kwargs
         )
@@ -288,6 +291,32 @@ class ConfigStore(ConfigParserStore):
                 else:
                     raise ValueError(f"Unknown target_kind: {self.target_kind}")
 
+    def reload(self):
+        """Re-read the config file, replacing the current sections."""
+        if self.source_kind != "filepath":
+            raise ValueError(
+                f"Can only reload file-based configs, not {self.source_kind}"
+            )
+        for section in self.store.sections():
+            self.store.remove_section(section)
+        self.store.read(self.source)
+        self._mutations += 1
+
+    def watch(self, callback=None):
+        """Reload the config whenever its file changes (see ``config2py.watch``).
+
+        :param callback: Optional function called with the store after each reload
+        :return: A handle whose ``cancel()`` method stops watching
+        """
+        from config2py.watch import watch_path
+
+        def reload_and_notify(path):
+            self.reload()
+            if callback is not None:
+                callback(self)
+
+        return watch_path(self.source, reload_and_notify)
+
     def __enter__(self):
         self._within_context_manager = True
         return self
@@ -296,13 +325,29 @@ class ConfigStore(ConfigParserStore):
         self._within_context_manager = False
         return self.persist()
 
+    def version(self):
+        """Return a cheap token that changes when the config (may have) changed.
+
+        Combines a counter of top-level mutations, a digest of the parsed sections
+        (so that edits made through sections, like ``s['sec']['k'] = 'v'``, count
+        too) and the stat signature of the backing file (when the source is a
+        filepath).
+        """
+        parser = self.store
+        state = hash(repr((parser._defaults, parser._sections)))
+        if self.source_kind == "filepath":
+            return (self._mutations, state, file_signature(self.source))
+        return (self._mutations, state)
+
     @persist_after_operation
     def __setitem__(self, k, v):
         super().__setitem__(k, v)
+        self._mutations += 1
 
     @persist_after_operation
     def __delitem__(self, k):
         super().__delitem__(k)
+        self._mutations += 1
 
     # __setitem__ = super_and_persist(ConfigParser, '__setitem__')
     # __delitem__ = super_and_persist(ConfigParser, '__delitem__')
@@ -0,0 +1,200 @@
+"""A store persisting each key in a row of a SQLite database.
+
+Unlike the stores of ``sync_store``, which hold their data in memory and write it all
+(or a patch of it) on flush, ``SqliteStore`` reads and writes key by key, so large
+stores stay cheap to open and to update.
+"""
+
+import json
+import os
+import threading
+import weakref
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Callable, Iterator, Union
+
+from config2py.sync_store import (
+    BatchScope,
+    KeyPath,
+    _NestableBatches,
+    _normalize_key_path,
+    _validate_batch_scope,
+)
+
+__all__ = ["SqliteStore"]
+
+
+class SqliteStore(_NestableBatches, MutableMapping):
+    """
+    A MutableMapping persisted, key by key, in a SQLite database.
+
+    Unlike the other stores, the data isn't held in memory: each read queries the
+    database for that key only, and each write updates only that key's row, so
+    stores with many (or large) values stay cheap to open and to update.
+
+    The interface is the same as ``SyncStore``'s: outside a ``with`` block, every
+    mutation is committed immediately; inside one, mutations happen in a single
+    transaction, committed on exit of the outermost block (or by ``flush()``). The
+    database uses SQLite's
+    WAL journal mode, so readers (in other processes too) aren't blocked by a
+    writer, and see only committed transactions.
+
+    Values are stored as JSON text, and keys as text. Several stores can share a
+    database: ``key_path`` namespaces keys the way it selects a section of a
+    ``FileStore``, and ``table`` picks the table.
+
+    Args:
+        filepath: Path of the database file (supports ~ expansion)
+        key_path: Optional namespace (a dotted string or a tuple of strings)
+        table: Name of the table holding the items
+        loads: Function decoding a stored value (default: ``json.loads``)
+        dumps: Function encoding a value for storage (default: ``json.dumps``)
+        timeout: Seconds to wait for another connection's write lock
+        batch_scope: How ``with`` blocks behave across threads (see ``SyncStore``).
+            With ``'shared'``, other threads' writes during a block join its
+            transaction.
+
+    Example:
+        >>> import tempfile
+        >>> with tempfile.TemporaryDirectory() as tmpdir:
+        ...     path = os.path.join(tmpdir, 'configs.db')
+        ...     store = SqliteStore(path, key_path='servers')
+        ...     store['main'] = {'host': 'localhost', 'port': 8080}
+        ...     with store:  # One transaction
+        ...         store['backup'] = {'host': 'example.com'}
+        ...         store['main']['port']
+        ...     print(sorted(SqliteStore(path, key_path='servers')))
+        ...     print(dict(SqliteStore(path, key_path='other')))
+        ...     store.close()
+        8080
+        ['backup', 'main']
+        {}
+    """
+
+    def __init__(
+        self,
+        filepath: Union[str, Path],
+        *,
+        key_path: KeyPath = None,
+        table: str = "config2py",
+        loads: Callable[[str], Any] = json.loads,
+        dumps: Callable[[Any], str] = json.dumps,
+        timeout: float = 10.0,
+        batch_scope: BatchScope = "shared",
+    ):
+        import sqlite3  # only needed (and imported) if using SQLite
+
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table!r}")
+        self.filepath = Path(filepath).expanduser()
+        self.key_path = _normalize_key_path(key_path)
+        self.table = table
+        self.loads = loads
+        self.dumps = dumps
+        self._namespace = ".".join(self.key_path)
+        self._lock = threading.RLock()
+        self.batch_scope = _validate_batch_scope(batch_scope)
+        self._version = 0
+        # Autocommit mode: we open (and commit) transactions ourselves
+        self._conn = sqlite3.connect(
+            os.fspath(self.filepath),
+            timeout=timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        weakref.finalize(self, self._conn.close)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{table}" '
+            "(namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "PRIMARY KEY (namespace, key))"
+        )
+
+    def _query(self, sql: str, *params):
+        with self._lock:
+            return self._conn.execute(sql, (self._namespace, *params)).fetchall()
+
+    def _write(self, sql: str, *params) -> int:
+        """Execute a write, in the current transaction if batching, returning the
+        number of rows changed."""
+        with self._lock:
+            if not self._auto_sync and not self._conn.in_transaction:
+                self._conn.execute("BEGIN IMMEDIATE")
+            rowcount = self._conn.execute(sql, (self._namespace, *params)).rowcount
+            self._version += 1
+            return rowcount
+
+    def __getitem__(self, key):
+        rows = self._query(
+            f'SELECT value FROM "{self.table}" WHERE namespace = ? AND key = ?', key
+        )
+        if not rows:
+            raise KeyError(key)
+        return self.loads(rows[0][0])
+
+    def __contains__(self, key):
+        return bool(
+            self._query(
+                f'SELECT 1 FROM "{self.table}" WHERE namespace = ? AND key = ?', key
+            )
+        )
+
+    def __setitem__(self, key, value):
+        self._write(
+            f'INSERT INTO "{self.table}" (namespace, key, value) VALUES (?, ?, ?) '
+            "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value",
+            key,
+            self.dumps(value),
+        )
+
+    def __delitem__(self, key):
+        if not self._write(
+            f'DELETE FROM "{self.table}" WHERE namespace = ? AND key = ?', key
+        ):
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator:
+        rows = self._query(
+            f'SELECT key FROM "{self.table}" WHERE namespace = ? ORDER BY rowid'
+        )
+        return (key for (key,) in rows)
+
+    def __len__(self):
+        return self._query(f'SELECT COUNT(*) FROM "{self.table}" WHERE namespace = ?')[
+            0
+        ][0]
+
+    def clear(self):
+        """Remove all items (of this namespace), with a single statement."""
+        self._write(f'DELETE FROM "{self.table}" WHERE namespace = ?')
+
+    def update(self, other=(), /, **kwds):
+        """Update from a mapping or iterable of pairs, in a single transaction."""
+        with self:
+            super().update(other, **kwds)
+
+    def version(self):
+        """Return a token that changes whenever the store's contents (may) change.
+
+        Combines a counter of this store's writes with SQLite's ``data_version``,
+        which changes when other connections commit changes to the database.
+        """
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            return (self._version, data_version)
+
+    def flush(self):
+        """Commit the current transaction, if any."""
+        with self._lock:
+            if self._conn.in_transaction:
+                self._conn.execute("COMMIT")
+
+    def close(self):
+        """Commit pending changes and close the database connection."""
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+    def __repr__(self):
+        key_path_str = f", key_path={self.key_path!r}" if self.key_path else ""
+        return f"{self.__class__.__name__}({self.filepath!r}{key_path_str})"
@@ -27,18 +27,44 @@ storage. Supports deferred sync via context manager for batch operations.
 >>> os.unlink(temp_file)
 """
 
-from typing import Callable, Any, Iterator, Union, Tuple, Optional, Dict
-from collections.abc import MutableMapping
+from typing import Callable, Any, Iterator, Union, Tuple, Optional, Dict, Literal
+from collections.abc import Mapping, MutableMapping
 from pathlib import Path
+from itertools import chain
+from contextlib import contextmanager, nullcontext
+import atexit
+import hashlib
+import importlib
+import inspect
 import json
+import mmap
+import os
+import re
+import threading
+import time
+import uuid
+import warnings
+import weakref
+import copy
 from functools import reduce
+from types import MappingProxyType
+
+try:
+    import fcntl
+except ImportError:  # not POSIX (e.g. Windows): no cross-process file locking
+    fcntl = None
 
 __all__ = [
     "SyncStore",
     "FileStore",
     "JsonStore",
+    "JournalStore",
     "register_extension",
     "get_format_handlers",
+    "file_signature",
+    "atomic_write",
+    "MergeConflict",
+    "DELETED",
 ]
 
 # Note: Independent module. No imports from config2py, dol etc.
@@ -48,29 +74,422 @@ __all__ = [
 KeyPath = Union[str, Tuple[str, ...], None]
 Loader = Callable[[], dict]
 Dumper = Callable[[dict], None]
+PatchDumper = Callable[[dict, set], None]
+FileSignature = Tuple[int, int, int]
+
+_MISSING = object()
+
+
+class _Deleted:
+    def __repr__(self):
+        return "DELETED"
+
+
+DELETED = _Deleted()  # Stands for "no value" (absent or deleted key) in merges
+
+
+class MergeConflict(RuntimeError):
+    """Raised when both we and another writer changed a key in different ways."""
+
+    def __init__(self, key, base, ours, theirs):
+        super().__init__(
+            f"Conflicting changes for key {key!r}: "
+            f"base={base!r}, ours={ours!r}, theirs={theirs!r}"
+        )
+        self.key, self.base, self.ours, self.theirs = key, base, ours, theirs
+
+
+def file_signature(filepath: Union[str, Path]) -> Optional[FileSignature]:
+    """Return a cheap ``(mtime_ns, size, inode)`` token for a file (or directory).
+
+    Returns ``None`` if the path doesn't exist. Two equal signatures mean the file
+    (very likely) didn't change, without having to read its contents.
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     sig = file_signature(tmpdir)
+    ...     len(sig), file_signature(os.path.join(tmpdir, 'missing.json'))
+    (3, None)
+    """
+    try:
+        st = os.stat(filepath)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+Durability = Literal["none", "flush", "fsync"]
+
+
+def _validate_durability(durability: str) -> str:
+    if durability not in ("none", "flush", "fsync"):
+        raise ValueError("durability must be 'none', 'flush' or 'fsync'")
+    return durability
+
+
+def atomic_write(
+    filepath: Union[str, Path],
+    content: Union[str, bytes],
+    *,
+    durability: Durability = "none",
+) -> FileSignature:
+    """Write ``content`` to ``filepath`` atomically.
+
+    The content is written to a temporary file in the same directory, which is then
+    renamed over ``filepath`` with ``os.replace``. Readers (and a crash) therefore
+    see either the old or the new content, never a truncated file.
+    An existing file's permissions are kept.
+
+    Args:
+        filepath: The file to write (symlinks are followed)
+        content: Text or bytes to write
+        durability: How hard to try to make the write survive a power loss:
+            ``'none'`` (default) relies on the OS to write the data eventually,
+            ``'flush'`` flushes the file's contents to disk (``fsync``) before the
+            rename, ``'fsync'`` also fsyncs the directory, so the rename itself is
+            on disk when this function returns.
+
+    Returns:
+        The ``file_signature`` of the written file. It is taken from the file
+        itself, so it's not affected by other processes writing right after us.
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as tmpdir:
+    ...     path = os.path.join(tmpdir, 'data.json')
+    ...     _ = atomic_write(path, '{"a": 1}', durability='fsync')
+    ...     _ = atomic_write(path, b'{"a": 2}')
+    ...     print(open(path).read(), os.listdir(tmpdir))
+    {"a": 2} ['data.json']
+    """
+    _validate_durability(durability)
+    filepath = os.path.realpath(filepath)
+    dirpath, filename = os.path.split(filepath)
+    tmp_path = os.path.join(dirpath, f".{filename}.{uuid.uuid4().hex[:12]}.tmp")
+    try:
+        existing_mode = os.stat(filepath).st_mode & 0o7777
+    except FileNotFoundError:
+        existing_mode = None
+
+    # 0o666 is masked by the umask, as for a regular open(..., 'w')
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with open(fd, "wb" if isinstance(content, bytes) else "w") as f:
+            f.write(content)
+            f.flush()
+            if durability != "none":
+                os.fsync(f.fileno())
+            st = os.fstat(f.fileno())
+        if existing_mode is not None:
+            os.chmod(tmp_path, existing_mode)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    if durability == "fsync":
+        _fsync_dir(dirpath)
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _content_digest(content) -> bytes:
+    """A digest of (text or binary) file content, to tell if it changed."""
+    if isinstance(content, str):
+        content = content.encode("utf-8", "surrogatepass")
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+def _fsync_dir(dirpath: str) -> None:
+    """Fsync a directory, so renames in it are durable (no-op where unsupported)."""
+    try:
+        fd = os.open(dirpath, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    except OSError:
+        return  # e.g. Windows, where directories can't be opened this way
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class _FileLock:
+    """A cross-process readers/writer lock, using ``fcntl.flock`` on a lock file.
+
+    The lock is taken on a separate, never-replaced lock file, since atomic writes
+    replace the data file (and a lock on it would be lost with its inode).
+    Nested acquisitions (by the same owner) are no-ops. Waiting times are
+    accumulated in ``stats``.
+    """
+
+    def __init__(self, lock_path: Path, *, timeout: Optional[float], stats: dict):
+        if fcntl is None:
+            raise ValueError("File locking requires fcntl, which isn't available here")
+        self.lock_path = lock_path
+        self.timeout = timeout
+        self.stats = stats
+        self._fd = None
+        self._exclusive = False
+
+    @contextmanager
+    def __call__(self, exclusive: bool):
+        if self._fd is not None:  # already held
+            if exclusive and not self._exclusive:
+                raise RuntimeError(
+                    "Can't upgrade a shared file lock to an exclusive one"
+                )
+            yield
+            return
+        self._acquire(exclusive)
+        try:
+            yield
+        finally:
+            fd, self._fd = self._fd, None
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def _acquire(self, exclusive: bool):
+        operation = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o666)
+        start = time.perf_counter()
+        try:
+            if self.timeout is None:
+                fcntl.flock(fd, operation)
+            else:
+                deadline = start + self.timeout
+                backoff = 0.001
+                while True:
+                    try:
+                        fcntl.flock(fd, operation | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        if time.perf_counter() >= deadline:
+                            raise TimeoutError(
+                                f"Couldn't lock {self.lock_path} within {self.timeout}s"
+                            )
+                        time.sleep(backoff)
+                        backoff = min(backoff * 2, 0.05)
+        except BaseException:
+            os.close(fd)
+            raise
+        waited = time.perf_counter() - start
+        self.stats["lock_acquisitions"] += 1
+        self.stats["lock_wait_seconds"] += waited
+        self.stats["max_lock_wait_seconds"] = max(
+            self.stats["max_lock_wait_seconds"], waited
+        )
+        self._fd = fd
+        self._exclusive = exclusive
 
 
 # --------------------------------------------------------------------------------------
 # Extension Registry
 
 _extension_registry: Dict[str, Tuple[Callable, Callable]] = {}
+# Loaders that can parse a bytes-like buffer (such as a memory-mapped file) directly
+_buffer_loaders: Dict[str, Callable] = {}
+# Loaders that can parse only the value at a key path of a document
+_path_loaders: Dict[str, Callable] = {}
+
+
+def register_extension(
+    ext: str,
+    loader: Callable,
+    dumper: Callable,
+    *,
+    buffer_loader: Optional[Callable] = None,
+    path_loader: Optional[Callable] = None,
+) -> None:
+    """Register loader/dumper for a file extension.
+
+    A ``buffer_loader`` can also be given: a function parsing the file's raw bytes,
+    given as a bytes-like object (in practice, a ``mmap.mmap``), without keeping
+    references to it. ``FileStore`` uses it to parse large files straight from a
+    memory map (see its ``mmap_threshold``).
+
+    And a ``path_loader``: a function ``(content, key_path) -> value`` parsing only
+    the value at ``key_path`` (a tuple of keys) of the file's content, raising
+    ``KeyError`` if there's none. ``FileStore`` uses it to load sections without
+    parsing the whole file (see its ``partial_load``).
+    """
+    ext = ext.lower()
+    _extension_registry[ext] = (loader, dumper)
+    for registry, func in [
+        (_buffer_loaders, buffer_loader),
+        (_path_loaders, path_loader),
+    ]:
+        if func is None:
+            registry.pop(ext, None)
+        else:
+            registry[ext] = func
+
+
+def _decoding(loads: Callable[[str], Any]) -> Callable:
+    """Make a buffer loader from a text loader, decoding the buffer in one go."""
 
+    def buffer_loader(buffer):
+        return loads(str(buffer, "utf-8"))
 
-def register_extension(ext: str, loader: Callable, dumper: Callable) -> None:
-    """Register loader/dumper for a file extension."""
-    _extension_registry[ext.lower()] = (loader, dumper)
+    return buffer_loader
 
 
 def get_format_handlers(
     filepath: Union[str, Path],
 ) -> Optional[Tuple[Callable, Callable]]:
-    """Get loader/dumper for a file based on extension."""
-    ext = Path(filepath).suffix.lower()
-    return _extension_registry.get(ext)
+    """Get loader/dumper for a file based on extension.
+
+    The extension of a compressed file (e.g. ``config.json.gz``) is that of the
+    file it compresses.
+    """
+    return _extension_registry.get(_format_suffix(filepath))
+
+
+def _format_suffix(filepath: Union[str, Path]) -> str:
+    """The (lower case) extension giving the format of a (maybe compressed) file."""
+    path = Path(filepath)
+    ext = path.suffix.lower()
+    if ext in _COMPRESSIONS:
+        return Path(path.stem).suffix.lower()
+    return ext
+
+
+# Compressed files: extension -> (module, name of its compress level argument)
+_COMPRESSIONS = {
+    ".gz": ("gzip", "compresslevel"),
+    ".bz2": ("bz2", "compresslevel"),
+    ".xz": ("lzma", "preset"),
+}
+
+
+def _compression_codec(
+    filepath: Union[str, Path], level: Optional[int] = None
+) -> Optional[Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]]:
+    """Return ``(compress, decompress)`` functions if ``filepath`` is compressed.
+
+    Compression is deterministic (gzip headers get no timestamp), so the same
+    content always gives the same bytes.
+    """
+    compression = _COMPRESSIONS.get(Path(filepath).suffix.lower())
+    if compression is None:
+        return None
+    module_name, level_arg = compression
+    module = importlib.import_module(module_name)
+    compress_kwargs = {} if level is None else {level_arg: level}
+    if module_name == "gzip":
+        compress_kwargs["mtime"] = 0
+
+    def compress(data: bytes) -> bytes:
+        return module.compress(data, **compress_kwargs)
+
+    return compress, module.decompress
+
+
+# Parsing parts of JSON documents
+
+_JSON_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Everything up to (and including) the next bracket that isn't in a string
+_JSON_NEXT_BRACKET = re.compile(
+    r'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*([\[\]{}])'
+)
+_JSON_SCALAR_END = re.compile(r"[,\]}\s]|$")
+
+
+def _json_skip_value(text: str, i: int) -> int:
+    """Return the index right after the JSON value starting at ``text[i]``.
+
+    Containers are skipped by matching brackets, each step being a regular
+    expression jumping to the next bracket that isn't in a string, so nothing in
+    them is parsed.
+    """
+    char = text[i : i + 1]
+    if char == '"':
+        match = _JSON_STRING.match(text, i)
+        if match is None:
+            raise ValueError(f"Unterminated string at index {i}")
+        return match.end()
+    if char not in ("{", "["):
+        return _JSON_SCALAR_END.search(text, i).start()
+    depth = 0
+    match_next_bracket = _JSON_NEXT_BRACKET.match
+    while True:
+        match = match_next_bracket(text, i)
+        if match is None:
+            raise ValueError("Unbalanced brackets in JSON")
+        i = match.end()
+        if match.group(1) in "[{":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return i
+
+
+def _json_member_span(text: str, i: int, key: str) -> Tuple[int, int]:
+    """Return the span of the value of ``key`` in the JSON object at ``text[i]``.
+
+    Scanning stops at the first member with that key, so the rest of the object is
+    never even skipped over. Hence, unlike ``json.loads`` (for which the last one
+    wins), the first of duplicate keys wins: RFC 8259 leaves the behavior of
+    duplicate keys unspecified anyway. Raises ``KeyError`` if the object has no
+    such key, or if the value at ``text[i]`` isn't an object.
+    """
+    if text[i : i + 1] != "{":
+        raise KeyError(key)
+    i = _JSON_WHITESPACE.match(text, i + 1).end()
+    if text[i : i + 1] == "}":
+        raise KeyError(key)
+    while True:
+        key_end = _json_skip_value(text, i)
+        raw_key = text[i + 1 : key_end - 1]
+        member_key = json.loads(text[i:key_end]) if "\\" in raw_key else raw_key
+        i = _JSON_WHITESPACE.match(text, key_end).end()
+        if text[i : i + 1] != ":":
+            raise ValueError(f"Expecting ':' at index {i}")
+        value_start = _JSON_WHITESPACE.match(text, i + 1).end()
+        value_end = _json_skip_value(text, value_start)
+        if member_key == key:
+            return value_start, value_end
+        i = _JSON_WHITESPACE.match(text, value_end).end()
+        char = text[i : i + 1]
+        if char == "}":
+            raise KeyError(key)
+        if char != ",":
+            raise ValueError(f"Expecting ',' or '}}' at index {i}")
+        i = _JSON_WHITESPACE.match(text, i + 1).end()
+
+
+def _json_path_loader(content: Union[str, bytes], key_path: Tuple[str, ...]) -> Any:
+    """Parse only the value at ``key_path`` of a JSON document.
+
+    The values of other keys along the way are skipped over, not parsed (nor
+    validated), and whatever follows the keys of the path isn't even scanned. With
+    duplicate keys, the first one wins (see ``_json_member_span``).
+
+    >>> _json_path_loader('{"a": {"x": [1, "]"], "b": {"c": 3}}, "d": 4}', ('a', 'b'))
+    {'c': 3}
+    >>> _json_path_loader('{"a": {"b": 1}}', ('a', 'nope'))
+    Traceback (most recent call last):
+      ...
+    KeyError: 'nope'
+    """
+    text = content.decode("utf-8") if isinstance(content, bytes) else content
+    start = _JSON_WHITESPACE.match(text).end()
+    end = len(text)
+    for key in key_path:
+        start, end = _json_member_span(text, start, key)
+    return json.loads(text[start:end])
 
 
 # Register standard formats
-register_extension(".json", json.loads, json.dumps)
+register_extension(
+    ".json",
+    json.loads,
+    json.dumps,
+    buffer_loader=_decoding(json.loads),
+    path_loader=_json_path_loader,
+)
 
 # TODO: Use register-if-available pattern (with context managers.. implemented somewhere...)
 
@@ -101,8 +520,9 @@ except ImportError:
 try:
     import yaml
 
-    register_extension(".yaml", yaml.safe_load, yaml.dump)
-    register_extension(".yml", yaml.safe_load, yaml.dump)
+    # yaml.safe_load reads streams, which memory maps are
+    register_extension(".yaml", yaml.safe_load, yaml.dump, buffer_loader=yaml.safe_load)
+    register_extension(".yml", yaml.safe_load, yaml.dump, buffer_loader=yaml.safe_load)
 except ImportError:
     pass
 
@@ -111,13 +531,20 @@ try:
     import tomllib  # Python 3.11+
     import tomli_w
 
-    register_extension(".toml", tomllib.loads, tomli_w.dumps)
+    register_extension(
+        ".toml",
+        tomllib.loads,
+        tomli_w.dumps,
+        buffer_loader=_decoding(tomllib.loads),
+    )
 except ImportError:
     try:
         import tomli
         import tomli_w
 
-        register_extension(".toml", tomli.loads, tomli_w.dumps)
+        register_extension(
+            ".toml", tomli.loads, tomli_w.dumps, buffer_loader=_decoding(tomli.loads)
+        )
     except ImportError:
         pass
 
@@ -145,11 +572,22 @@ def _get_nested(data: dict, path: Tuple[str, ...]) -> Any:
 
 
 def _set_nested(data: dict, path: Tuple[str, ...], value: Any) -> dict:
-    """Set value in nested dict, creating intermediate dicts as needed."""
+    """Set value in nested dict (in place), creating intermediate dicts as needed.
+
+    Only the dicts along the path are touched, so the cost is proportional to the
+    depth of the path, not to the size of the data. Returns the updated dict (a new
+    one only if ``data`` isn't a dict).
+
+    >>> data = {'a': {'b': 1}, 'c': 2}
+    >>> _set_nested(data, ('a', 'x', 'y'), 3) is data
+    True
+    >>> data
+    {'a': {'b': 1, 'x': {'y': 3}}, 'c': 2}
+    """
     if not path:
         return value
 
-    result = data.copy() if isinstance(data, dict) else {}
+    result = data if isinstance(data, dict) else {}
     current = result
 
     for key in path[:-1]:
@@ -161,19 +599,198 @@ def _set_nested(data: dict, path: Tuple[str, ...], value: Any) -> dict:
     return result
 
 
+# --------------------------------------------------------------------------------------
+# Write-behind flushing
+
+
+class _FlushScheduler:
+    """A single background thread that flushes write-behind stores when they're due.
+
+    Stores with pending changes are held (strongly) until they're flushed, so
+    pending changes can't be lost to garbage collection, and ``flush_all`` is
+    registered to run at interpreter exit. A store whose background flush fails is
+    rescheduled (after its ``flush_delay``), so its changes are retried, and still
+    flushed at exit.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._due = {}  # id(store) -> (due_time, store)
+        self._flushing = {}  # id(store) -> store, for flushes in progress
+        self._thread = None
+
+    def schedule(self, store, due: float):
+        """Schedule ``store.flush()`` at (monotonic) time ``due``."""
+        with self._cond:
+            self._due[id(store)] = (due, store)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="config2py-flusher", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify_all()
+
+    def cancel(self, store):
+        with self._cond:
+            self._due.pop(id(store), None)
+
+    def _pop_ready(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if not self._due:
+                    self._cond.wait()
+                    continue
+                next_due = min(due for due, _ in self._due.values())
+                if next_due <= now:
+                    break
+                self._cond.wait(next_due - now)
+            ready = [k for k, (due, _) in self._due.items() if due <= now]
+            stores = [self._due.pop(k)[1] for k in ready]
+            self._flushing.update((id(store), store) for store in stores)
+            return stores
+
+    def _run(self):
+        while True:
+            for store in self._pop_ready():
+                flushed = _flush_in_background(store)
+                with self._cond:
+                    del self._flushing[id(store)]
+                    if not flushed and id(store) not in self._due:
+                        retry_delay = getattr(store, "flush_delay", None) or 1.0
+                        self._due[id(store)] = (time.monotonic() + retry_delay, store)
+                    self._cond.notify_all()
+
+    def flush_all(self):
+        """Flush every store that has pending changes.
+
+        Waits for the flushes in progress to complete first, so that stores whose
+        background flush fails are flushed (retried) too.
+        """
+        with self._cond:
+            while self._flushing:
+                self._cond.wait()
+            stores = [store for _, store in self._due.values()]
+            self._due.clear()
+        for store in stores:
+            _flush_in_background(store)
+
+
+def _flush_in_background(store) -> bool:
+    """Flush ``store``, warning (instead of raising) if it fails. Returns success."""
+    try:
+        store.flush()
+    except Exception as e:
+        warnings.warn(f"Background flush of {store!r} failed: {e!r}")
+        return False
+    return True
+
+
+_flush_scheduler = _FlushScheduler()
+atexit.register(_flush_scheduler.flush_all)
+
+
 # --------------------------------------------------------------------------------------
 # Core Classes
 
+BatchScope = Literal["shared", "thread"]
+
 
-class SyncStore(MutableMapping):
+class _NestableBatches:
+    """Thread-safe, nestable ``with`` blocks deferring syncs to the outermost exit.
+
+    Classes using it must have ``_lock`` (an ``RLock``), ``batch_scope`` and a
+    ``flush()`` method.
+    """
+
+    _batch_depth = 0  # How many with blocks we're in
+
+    @property
+    def _auto_sync(self) -> bool:
+        """Whether mutations sync immediately (i.e. we're not in a batch)."""
+        return self._batch_depth == 0
+
+    def __enter__(self):
+        """Enter deferred sync mode."""
+        if self.batch_scope == "thread":
+            self._lock.acquire()  # Held until the matching __exit__
+        with self._lock:
+            self._batch_depth += 1
+        return self
+
+    def __exit__(self, *args):
+        """Exit deferred sync mode, flushing changes if leaving the outermost batch."""
+        try:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.flush()
+        finally:
+            if self.batch_scope == "thread":
+                self._lock.release()
+
+
+def _validate_batch_scope(batch_scope: str) -> str:
+    if batch_scope not in ("shared", "thread"):
+        raise ValueError("batch_scope must be 'shared' or 'thread'")
+    return batch_scope
+
+
+class SyncStore(_NestableBatches, MutableMapping):
     """
     A MutableMapping that automatically syncs changes to backing storage.
 
     Supports deferred sync via context manager for efficient batch operations.
 
+    Outside a ``with`` block, every mutation syncs immediately, unless a
+    ``flush_delay`` is given. In that case, writes are coalesced ("write-behind"):
+    a background thread flushes once no mutation happened for ``flush_delay``
+    seconds, or ``max_flush_delay`` seconds after the first unflushed mutation,
+    whichever comes first. Pending changes are flushed at interpreter exit, and
+    ``flush()`` forces a write at any time.
+
+    The store records which (top-level) keys were set or deleted since the last
+    flush. Backends that can persist just those changes (a database, an append-only
+    log...) can be given as a ``patch_dumper``, making the cost of a flush
+    proportional to the size of the change rather than to the size of the data.
+
+    Stores can be shared between threads: mutations and flushes are serialized by a
+    lock, and iterating works on a copy of the keys. ``with`` blocks can be nested
+    (or re-entered by functions that batch their own changes): only the outermost
+    one flushes, on exit.
+
     Args:
         loader: Function that returns the current data as a dict
         dumper: Function that persists the data dict to storage
+        patch_dumper: Optional function persisting only the changes since the last
+            flush, called with ``(updated, deleted)``: a dict of the keys set (with
+            their current values) and a set of the keys deleted. If given, it's
+            used instead of ``dumper`` (which remains the fallback when the
+            changed keys are unknown).
+        flush_delay: Debounce interval (in seconds) for write-behind mode.
+            If None (default), mutations are synced immediately.
+        max_flush_delay: Maximum time (in seconds) a mutation can stay unflushed
+            in write-behind mode. If None, only ``flush_delay`` applies.
+        max_pending: Flush synchronously once this many mutations are pending in
+            write-behind mode.
+        batch_scope: With ``'shared'`` (default), a ``with`` block defers the syncs
+            of all the store's mutations, made by any thread, until it exits. With
+            ``'thread'``, a ``with`` block holds the store's lock until it exits, so
+            other threads' reads and writes wait rather than see (or mix their
+            changes with) a batch in progress.
+        snapshots: If True, an immutable copy of the data is published each time
+            it's loaded or flushed, and ``snapshot()`` returns it without copying
+            anything, so readers (in other threads, say) get a consistent view of
+            the last committed state, never a batch in progress.
+        lazy: If True, the data isn't loaded until it's first needed (e.g. by a
+            read, an iteration or a mutation). ``clear()`` doesn't need it: a store
+            cleared before being loaded never calls its loader.
+        key_sep: If given (e.g. ``'.'``), string keys containing it are paths into
+            nested dicts: ``store['a.b.c']`` is ``store['a']['b']['c']``, and
+            setting or deleting it updates the nested dict in place (creating
+            missing intermediate dicts when setting), recording ``'a'`` as changed.
+            Iteration and ``len`` only concern top-level keys. A top-level key that
+            contains the separator (e.g. ``'a.b'`` itself) is taken literally.
 
     Example:
         >>> def my_loader():
@@ -196,63 +813,436 @@ class SyncStore(MutableMapping):
         ...     # Not synced yet
         >>> data_holder[0]  # Now synced
         {'x': 1, 'y': 2, 'a': 1, 'b': 2}
+        >>>
+        >>> # Write-behind: coalesce many writes into one, done in the background
+        >>> store = SyncStore(my_loader, my_dumper, flush_delay=0.5)
+        >>> for i in range(100):
+        ...     store['counter'] = i
+        >>> data_holder[0]  # Not synced yet
+        {'x': 1, 'y': 2, 'a': 1, 'b': 2}
+        >>> store.flush()  # (would happen automatically half a second later)
+        >>> data_holder[0]
+        {'x': 1, 'counter': 99}
+        >>>
+        >>> # Persist only what changed
+        >>> def my_patch_dumper(updated, deleted):
+        ...     print(f"updated={updated}, deleted={deleted}")
+        >>> store = SyncStore(my_loader, my_dumper, patch_dumper=my_patch_dumper)
+        >>> with store:
+        ...     store['y'] = 2
+        ...     del store['x']
+        updated={'y': 2}, deleted={'x'}
+        >>>
+        >>> # Consistent read-only views of the committed data
+        >>> store = SyncStore(my_loader, my_dumper, snapshots=True)
+        >>> with store:
+        ...     store['y'] = 2
+        ...     dict(store.snapshot())
+        {'x': 1}
+        >>> dict(store.snapshot())
+        {'x': 1, 'y': 2}
+        >>>
+        >>> # Lazy loading: nothing is read until needed
+        >>> def my_loader():
+        ...     print('loading')
+        ...     return {'x': 1}
+        >>> store = SyncStore(my_loader, my_dumper, lazy=True)
+        >>> store['x']
+        loading
+        1
+        >>>
+        >>> # Nested access with paths
+        >>> store = SyncStore(lambda: {'db': {'host': 'a'}}, my_dumper, key_sep='.')
+        >>> store['db.port'] = 5432
+        >>> store['db.host'], data_holder[0]
+        ('a', {'db': {'host': 'a', 'port': 5432}})
     """
 
-    def __init__(self, loader: Loader, dumper: Dumper):
+    def __init__(
+        self,
+        loader: Loader,
+        dumper: Dumper,
+        *,
+        patch_dumper: Optional[PatchDumper] = None,
+        flush_delay: Optional[float] = None,
+        max_flush_delay: Optional[float] = None,
+        max_pending: Optional[int] = None,
+        batch_scope: BatchScope = "shared",
+        snapshots: bool = False,
+        lazy: bool = False,
+        key_sep: Optional[str] = None,
+    ):
         self._loader = loader
         self._dumper = dumper
+        self._patch_dumper = patch_dumper
         self._data = None
-        self._auto_sync = True
+        self.batch_scope = _validate_batch_scope(batch_scope)
         self._needs_flush = False
-        self._load()
+        self._version = 0
+        self._lock = threading.RLock()
+        self.flush_delay = flush_delay
+        self.max_flush_delay = max_flush_delay
+        self.max_pending = max_pending
+        self._n_pending = 0
+        self._first_pending_time = None
+        self._changed_keys = set()  # keys set or deleted since the last flush
+        self.snapshots = snapshots
+        self._snapshot = None
+        self._own_dicts = {}  # Nested dicts copied since the snapshot (by id)
+        self.key_sep = key_sep
+        if not lazy:
+            self._load()
 
     def _load(self):
         """Load data from backing storage."""
         self._data = self._loader()
+        self._version += 1
+        self._changed_keys = set()
+        self._publish_snapshot()
+
+    def _ensure_loaded(self):
+        """Load the data if it wasn't yet (see ``lazy``)."""
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    self._load()
+
+    def _publish_snapshot(self):
+        if self.snapshots:
+            # A shallow copy: values are shared with the store (treat them as frozen)
+            self._snapshot = MappingProxyType(dict(self._data))
+            self._own_dicts = {}
+
+    def _copy_spine(self, path: Tuple[str, ...]):
+        """Copy the nested dicts along ``path`` that the snapshot shares with the data,
+        so changing them in place doesn't change the snapshot (copy-on-write)."""
+        if not self.snapshots:
+            return
+        current = self._data
+        for key in path[:-1]:
+            child = current.get(key)
+            if not isinstance(child, dict):
+                return  # The rest of the path will be new dicts
+            if id(child) not in self._own_dicts:
+                child = current[key] = dict(child)
+                self._own_dicts[id(child)] = child
+            current = child
+
+    def snapshot(self) -> Mapping:
+        """Return a read-only view of the data as of the last load or flush.
+
+        The view never changes: later commits publish new snapshots. Requires
+        ``snapshots=True``.
+        """
+        if not self.snapshots:
+            raise RuntimeError("Snapshots are disabled: use snapshots=True")
+        self._ensure_loaded()
+        return self._snapshot
+
+    def reload(self):
+        """Reload data from backing storage, discarding unflushed changes."""
+        with self._lock:
+            self._load()
+            self._needs_flush = False
+
+    def _refresh_if_stale(self):
+        """Hook called before reads, to let subclasses pick up external changes."""
 
     def _mark_dirty(self):
-        """Mark data as changed and sync if auto_sync is enabled."""
+        """Mark data as changed and sync (or schedule a sync) if auto_sync is enabled."""
         self._needs_flush = True
-        if self._auto_sync:
+        self._version += 1
+        if not self._auto_sync:
+            return
+        if self.flush_delay is None:
+            self.flush()
+        else:
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Schedule a background flush, or flush now if too many mutations are pending."""
+        now = time.monotonic()
+        self._n_pending += 1
+        if self._first_pending_time is None:
+            self._first_pending_time = now
+        if self.max_pending is not None and self._n_pending >= self.max_pending:
             self.flush()
+            return
+        due = now + self.flush_delay
+        if self.max_flush_delay is not None:
+            due = min(due, self._first_pending_time + self.max_flush_delay)
+        _flush_scheduler.schedule(self, due)
+
+    def version(self):
+        """Return a token that changes whenever the store's contents (may) change.
+
+        Caches layered over the store can compare tokens instead of re-reading
+        values. For a plain ``SyncStore`` this is a counter bumped on every load
+        and mutation.
+        """
+        return self._version
 
     def flush(self):
         """Sync data to backing storage if changes exist."""
-        if self._needs_flush:
+        with self._lock:
+            if self._needs_flush:
+                self._persist()
+            self._mark_flushed()
+
+    def _mark_flushed(self):
+        """Record that the data in memory is now the data in storage."""
+        with self._lock:
+            if self._needs_flush:
+                self._needs_flush = False
+                self._changed_keys = set()
+                self._publish_snapshot()
+            if self._first_pending_time is not None:
+                self._n_pending = 0
+                self._first_pending_time = None
+                _flush_scheduler.cancel(self)
+
+    def _persist(self):
+        """Write the changes (or, if they can't be written alone, all the data)."""
+        if self._patch_dumper is not None and self._changed_keys:
+            updated, deleted = self.pending_changes()
+            self._patch_dumper(updated, deleted)
+        else:
             self._dumper(self._data)
-            self._needs_flush = False
 
-    def __enter__(self):
-        """Enter deferred sync mode."""
-        self._auto_sync = False
-        return self
+    def pending_changes(self) -> Tuple[dict, set]:
+        """Return ``(updated, deleted)``: the keys set (with their values) and the
+        keys deleted since the last flush."""
+        updated = {k: self._data[k] for k in self._changed_keys if k in self._data}
+        return updated, self._changed_keys - updated.keys()
+
+    def _key_to_path(self, key) -> Optional[Tuple[str, ...]]:
+        """Return the path a (``key_sep``-separated) key stands for, if it's one.
+
+        A top-level key containing the separator is taken literally, so all the keys
+        iterated over can be accessed.
+        """
+        if (
+            self.key_sep is not None
+            and isinstance(key, str)
+            and self.key_sep in key
+            and key not in self._data
+        ):
+            return tuple(key.split(self.key_sep))
+        return None
+
+    def _del_top_item(self, key):
+        """Delete a top-level key in memory (never taken as a path), without syncing."""
+        del self._data[key]
+        self._changed_keys.add(key)
 
-    def __exit__(self, *args):
-        """Exit deferred sync mode and flush changes."""
-        self.flush()
-        self._auto_sync = True
+    def _get_item(self, key):
+        """Get a key's value from memory."""
+        path = self._key_to_path(key)
+        if path is None:
+            return self._data[key]
+        try:
+            return _get_nested(self._data, path)
+        except (KeyError, TypeError):
+            raise KeyError(key) from None
+
+    def _has_item(self, key) -> bool:
+        try:
+            self._get_item(key)
+        except KeyError:
+            return False
+        return True
+
+    def _set_item(self, key, value):
+        """Set a key in memory, without syncing."""
+        path = self._key_to_path(key)
+        if path is None:
+            self._data[key] = value
+        else:
+            self._copy_spine(path)
+            _set_nested(self._data, path, value)
+            key = path[0]
+        self._changed_keys.add(key)
+
+    def _del_item(self, key):
+        """Delete a key in memory, without syncing."""
+        path = self._key_to_path(key)
+        if path is None:
+            del self._data[key]
+        else:
+            parent = self._get_item(self.key_sep.join(path[:-1]))
+            if not isinstance(parent, dict) or path[-1] not in parent:
+                raise KeyError(key)
+            self._copy_spine(path)
+            del self._get_item(self.key_sep.join(path[:-1]))[path[-1]]
+            key = path[0]
+        self._changed_keys.add(key)
+
+    def _read_lock(self):
+        """The lock reads take: with ``batch_scope='thread'``, reads wait for batches
+        of other threads to complete, like writes do."""
+        return self._lock if self.batch_scope == "thread" else nullcontext()
 
     def __getitem__(self, key):
-        return self._data[key]
+        self._ensure_loaded()
+        with self._read_lock():
+            self._refresh_if_stale()
+            return self._get_item(key)
+
+    def __contains__(self, key):
+        self._ensure_loaded()
+        with self._read_lock():
+            self._refresh_if_stale()
+            return self._has_item(key)
 
     def __setitem__(self, key, value):
-        self._data[key] = value
-        self._mark_dirty()
+        self._ensure_loaded()
+        with self._lock:
+            self._set_item(key, value)
+            self._mark_dirty()
 
     def __delitem__(self, key):
-        del self._data[key]
-        self._mark_dirty()
+        self._ensure_loaded()
+        with self._lock:
+            self._del_item(key)
+            self._mark_dirty()
+
+    # Bulk operations: MutableMapping's versions go through __setitem__/__delitem__,
+    # which would sync once per key. These mutate in memory, then sync once.
+
+    def update(self, other=(), /, **kwds):
+        """Update the store from a mapping or iterable of pairs, syncing once."""
+        if isinstance(other, Mapping):
+            items = other.items()
+        elif hasattr(other, "keys"):
+            items = ((k, other[k]) for k in other.keys())
+        else:
+            items = other
+        self._ensure_loaded()
+        with self._lock:
+            changed = False
+            for key, value in chain(items, kwds.items()):
+                self._set_item(key, value)
+                changed = True
+            if changed:
+                self._mark_dirty()
+
+    def clear(self):
+        """Remove all items, syncing once."""
+        with self._lock:
+            if self._data is None:
+                # Whatever the stored data is, the result is empty: don't load it
+                self._data = {}
+                self._mark_dirty()
+            elif self._data:
+                for key in list(self._data):
+                    self._del_top_item(key)
+                self._mark_dirty()
+
+    def pop(self, key, default=_MISSING):
+        """Remove ``key`` and return its value (or ``default`` if given)."""
+        self._ensure_loaded()
+        with self._lock:
+            if self._has_item(key):
+                value = self._get_item(key)
+                self._del_item(key)
+                self._mark_dirty()
+                return value
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def popitem(self):
+        """Remove and return a ``(key, value)`` pair."""
+        self._ensure_loaded()
+        with self._lock:
+            try:
+                key = next(iter(self._data))
+            except StopIteration:
+                raise KeyError("popitem(): store is empty") from None
+            value = self._data[key]
+            self._del_top_item(key)
+            self._mark_dirty()
+            return key, value
+
+    def setdefault(self, key, default=None):
+        """Return ``store[key]``, setting it to ``default`` first if missing."""
+        self._ensure_loaded()
+        with self._lock:
+            if self._has_item(key):
+                return self._get_item(key)
+            self[key] = default
+            return default
 
     def __iter__(self):
-        return iter(self._data)
+        self._ensure_loaded()
+        self._refresh_if_stale()
+        with self._lock:
+            return iter(list(self._data))
 
     def __len__(self):
-        return len(self._data)
+        self._ensure_loaded()
+        with self._read_lock():
+            self._refresh_if_stale()
+            return len(self._data)
 
     def __repr__(self):
+        if self._data is None:
+            return f"{self.__class__.__name__}(not loaded)"
         return f"{self.__class__.__name__}({len(self._data)} items)"
 
 
+class _Document:
+    """The parsed contents of a file, and the state that goes with it.
+
+    Each ``FileStore`` has one, or shares one with the other stores ("views") of
+    the same file made with ``share=True``.
+    """
+
+    def __init__(self, handlers=None):
+        self.handlers = handlers  # (loader, dumper, dump_kwargs) of its views
+        self.full_data = None  # The whole parsed document
+        self.file_sig = None  # Signature of the file it was read from or written to
+        self.content_digest = None  # Digest of the content read or written then
+        self.lock = threading.RLock()
+        self.batch_depth = 0
+        self._views = weakref.WeakValueDictionary()  # id(view) -> view
+
+    def add_view(self, view):
+        self._views[id(view)] = view
+
+    def views(self) -> list:
+        return list(self._views.values())
+
+    def has_unflushed_changes(self) -> bool:
+        return any(view._needs_flush for view in self.views())
+
+
+_shared_documents = weakref.WeakValueDictionary()  # (realpath, mode) -> _Document
+_shared_documents_lock = threading.Lock()
+
+
+def _shared_document(filepath: Path, mode: str, handlers: tuple) -> _Document:
+    """Get the process-wide document of ``filepath``, making it if needed."""
+    key = (os.path.realpath(filepath), mode)
+    with _shared_documents_lock:
+        document = _shared_documents.get(key)
+        if document is None:
+            document = _shared_documents[key] = _Document(handlers)
+        elif document.handlers != handlers:
+            raise ValueError(
+                f"{filepath} is already shared by stores with a different "
+                "loader, dumper or dump_kwargs"
+            )
+    return document
+
+
+def _get_nested_or_none(data, path: Tuple[str, ...]) -> Any:
+    try:
+        return _get_nested(data, path)
+    except (KeyError, TypeError):
+        return None
+
+
 class FileStore(SyncStore):
     """
     A SyncStore backed by a file with automatic format detection.
@@ -270,6 +1260,84 @@ class FileStore(SyncStore):
             for missing files. If None, FileNotFoundError is raised for missing files.
         create_key_path_content: Optional factory callable that returns initial content
             for missing key_path. If None, KeyError is raised for missing key paths.
+        check_interval: If not None, reads check (at most once every
+            ``check_interval`` seconds) whether the file changed on disk (by
+            comparing its ``(mtime_ns, size, inode)`` signature), and reload it if
+            so. Use 0 to check on every read. Unflushed local changes are never
+            discarded by such a reload.
+        on_reload: Optional callback, called with the store after it reloaded
+            because the file changed on disk.
+        watch: If True, watch the file (see ``config2py.watch``) and reload the
+            store as soon as it changes on disk, instead of (or on top of) checking
+            on reads.
+        atomic: Whether to write through a temporary file renamed over the target
+            (default True), so a crash or a concurrent reader never sees a partial
+            file.
+        durability: With ``atomic``, how hard to make writes survive a power loss:
+            ``'none'``, ``'flush'`` or ``'fsync'`` (see ``atomic_write``).
+        lock: If True, coordinate with other processes using the same file through
+            ``fcntl`` locks on a ``<filename>.lock`` file next to it: loads take a
+            shared lock (an exclusive one if the store may have to create the file
+            or key path), and flushes hold an exclusive lock for their whole
+            read-merge-write cycle, so concurrent writers of different sections
+            don't lose each other's updates. POSIX only.
+        lock_timeout: Seconds to wait for a lock before raising ``TimeoutError``
+            (None waits forever). Lock waits are counted in ``stats``.
+        merge: If True, a flush that finds the file changed on disk since we read
+            it (e.g. by another process) doesn't overwrite those changes: only the
+            keys we set or deleted are applied onto the fresh document (a three-way
+            merge against the version we loaded). Combine with ``lock=True`` so
+            that the merge and write happen under one short exclusive lock.
+        on_conflict: What to do, when merging, with a key that both we and the
+            other writer changed, to different values: ``'ours'`` (default) or
+            ``'theirs'`` to keep one side, ``'raise'`` to raise ``MergeConflict``,
+            or a function ``(key, base, ours, theirs) -> value`` (where ``DELETED``
+            stands for an absent value, and can be returned to delete the key).
+        mmap_threshold: If not None, files of at least this many bytes are
+            memory-mapped and parsed straight from the map (as UTF-8) when their
+            format has a registered ``buffer_loader`` (and the loader is that
+            format's registered one), saving the copy of the file's contents made by reading it.
+            Worth it for large files only, since mapping has a fixed cost.
+        flush_delay, max_flush_delay, max_pending: Write-behind settings
+            (see ``SyncStore``).
+        batch_scope: How ``with`` blocks behave across threads (see ``SyncStore``).
+        snapshots: Whether to publish snapshots (see ``SyncStore.snapshot``)
+        lazy: If True, don't read the file until the data is needed (see
+            ``SyncStore``). Clearing a store that has no ``key_path`` (and doesn't
+            ``merge``) then overwrites the file without ever parsing it.
+        share: If True, the store shares the parsed document, and its state, with
+            the other stores of the same file made with ``share=True`` in this
+            process (typically, views of different sections of a config file): the
+            file is parsed once, checked for changes once, and reloaded for all of
+            them at once. A ``with`` block on any of these stores batches them all,
+            and a flush writes the changes of all of them in a single write.
+            Can't be combined with ``merge``.
+        key_sep: Separator of paths in keys, to access nested values directly
+            (see ``SyncStore``)
+        partial_load: If True, a store with a ``key_path`` loads by parsing only
+            its section of the file, skipping over the rest (when its format has a
+            registered ``path_loader``, as JSON does, and the loader is that
+            format's registered one). The rest of the document is never turned
+            into Python objects, which saves a lot of memory for sections of large
+            files, and what follows the section isn't even scanned, so sections
+            near the start of a file load much faster (skipping what precedes it
+            takes about as long as parsing it, though). If a key of the path is
+            duplicated, the first one is loaded (``json.loads`` keeps the last).
+            The whole file is then parsed only if needed to write. Can't be
+            combined with ``share``.
+        skip_unchanged: If True (default), a flush that would write exactly what
+            the file already contains (as last read or written, and unchanged on
+            disk since) doesn't write it. Skipped writes are counted in ``stats``.
+        compression_level: Compression level used to write compressed files,
+            which are recognized by their extension: ``.gz`` (gzip), ``.bz2`` or
+            ``.xz`` (lzma), following the extension of their format (e.g.
+            ``config.json.gz``). They are decompressed and compressed
+            transparently. None (default) uses the compressor's default level.
+        parse_cache: A cache of parsed files, used to skip parsing the file when it
+            didn't change since it was last parsed (by any process). This is any
+            object with ``get(filepath, signature, codec, default)`` and
+            ``set(filepath, signature, codec, value)`` methods, such as
+            ``config2py.parse_cache.ParseCache``. Hits are counted in ``stats``.
 
     Example:
         >>> import tempfile
@@ -311,6 +1379,28 @@ class FileStore(SyncStore):
         dump_kwargs: Optional[dict] = None,
         create_file_content: Optional[Callable[[], dict]] = None,
         create_key_path_content: Optional[Callable[[], Any]] = None,
+        flush_delay: Optional[float] = None,
+        max_flush_delay: Optional[float] = None,
+        max_pending: Optional[int] = None,
+        batch_scope: BatchScope = "shared",
+        snapshots: bool = False,
+        lazy: bool = False,
+        check_interval: Optional[float] = None,
+        on_reload: Optional[Callable[["FileStore"], Any]] = None,
+        watch: bool = False,
+        atomic: bool = True,
+        durability: Durability = "none",
+        lock: bool = False,
+        lock_timeout: Optional[float] = 10.0,
+        merge: bool = False,
+        on_conflict: Union[str, Callable] = "ours",
+        mmap_threshold: Optional[int] = None,
+        share: bool = False,
+        key_sep: Optional[str] = None,
+        partial_load: bool = False,
+        skip_unchanged: bool = True,
+        compression_level: Optional[int] = None,
+        parse_cache: Optional[Any] = None,
     ):
         self.filepath = Path(filepath).expanduser()
         self.key_path = _normalize_key_path(key_path)
@@ -318,13 +1408,48 @@ class FileStore(SyncStore):
         self.dump_kwargs = dump_kwargs or {}
         self.create_file_content = create_file_content
         self.create_key_path_content = create_key_path_content
+        self.atomic = atomic
+        self.durability = _validate_durability(durability)
+        self.skip_unchanged = skip_unchanged
+        self.parse_cache = parse_cache
+        self.check_interval = check_interval
+        self.on_reload = on_reload
+        self._last_check_time = time.monotonic()
+        self.stats = {
+            "lock_acquisitions": 0,
+            "lock_wait_seconds": 0.0,
+            "max_lock_wait_seconds": 0.0,
+            "mmap_reads": 0,
+            "partial_loads": 0,
+            "skipped_writes": 0,
+            "parse_cache_hits": 0,
+        }
+        self.mmap_threshold = mmap_threshold
+        self.merge = merge
+        self.on_conflict = on_conflict
+        self._base = None  # the section as last read or written, to merge against
+        self._file_lock = None
+        if lock:
+            lock_path = self.filepath.with_name(self.filepath.name + ".lock")
+            self._file_lock = _FileLock(
+                lock_path, timeout=lock_timeout, stats=self.stats
+            )
 
         # Auto-detect format if not provided
+        ext = _format_suffix(self.filepath)
+        self._compression = _compression_codec(self.filepath, compression_level)
+        self._read_mode = "rb" if self._compression else mode
+        self._buffer_loader = self._path_loader = None
+        if loader is None or loader is _extension_registry.get(ext, (None,))[0]:
+            if self._compression is None:  # Compressed files can't be parsed in place
+                self._buffer_loader = _buffer_loaders.get(ext)
+            if partial_load and self.key_path:
+                self._path_loader = _path_loaders.get(ext)
         if loader is None or dumper is None:
             handlers = get_format_handlers(self.filepath)
             if handlers is None:
                 raise ValueError(
-                    f"No format handler registered for {self.filepath.suffix}. "
+                    f"No format handler registered for {ext or self.filepath.name}. "
                     f"Provide explicit loader/dumper or register the extension."
                 )
             auto_loader, auto_dumper = handlers
@@ -334,13 +1459,96 @@ class FileStore(SyncStore):
         self._file_loader = loader
         self._file_dumper = dumper
 
+        # The parsed document, kept so that flushes of a key_path section don't
+        # re-read the file unless it changed on disk (and possibly shared)
+        if share:
+            if merge or partial_load:
+                raise ValueError("merge or partial_load can't be used with share=True")
+            handlers = (loader, dumper, self.dump_kwargs)
+            self._doc = _shared_document(self.filepath, mode, handlers)
+        else:
+            self._doc = _Document()
+        self._doc.add_view(self)
+
         # Create loader/dumper closures for SyncStore
-        super().__init__(loader=self._load_from_file, dumper=self._dump_to_file)
+        super().__init__(
+            loader=self._load_from_file,
+            dumper=self._dump_to_file,
+            flush_delay=flush_delay,
+            max_flush_delay=max_flush_delay,
+            max_pending=max_pending,
+            batch_scope=batch_scope,
+            snapshots=snapshots,
+            lazy=lazy,
+            key_sep=key_sep,
+        )
+        self._lock = self._doc.lock
+        self._watch = _watch_file_store(self) if watch else None
+
+    # State kept in the (possibly shared) document
+
+    @property
+    def _full_data(self):
+        return self._doc.full_data
+
+    @_full_data.setter
+    def _full_data(self, value):
+        self._doc.full_data = value
+
+    @property
+    def _file_sig(self):
+        return self._doc.file_sig
+
+    @_file_sig.setter
+    def _file_sig(self, value):
+        self._doc.file_sig = value
+
+    @property
+    def _batch_depth(self):
+        return self._doc.batch_depth
+
+    @_batch_depth.setter
+    def _batch_depth(self, value):
+        self._doc.batch_depth = value
+
+    def _locked(self, exclusive: bool):
+        """Context manager holding the cross-process file lock (if ``lock=True``)."""
+        if self._file_lock is None:
+            return nullcontext()
+        return self._file_lock(exclusive)
 
     def _load_from_file(self) -> dict:
         """Read and parse file, returning the section specified by key_path."""
+        may_write = (
+            self.create_file_content is not None
+            or self.create_key_path_content is not None
+        )
+        with self._doc.lock, self._locked(exclusive=may_write):
+            section = self._load_section()
+            self._repoint_views()
+        if self.merge:
+            self._base = copy.deepcopy(section)
+        return section
+
+    def _load_section(self) -> dict:
+        if self._path_loader is not None:
+            section = self._read_section()
+            if section is not _MISSING:
+                return section
+        doc = self._doc
+        if (
+            self._data is None
+            and doc.full_data is not None
+            and (
+                doc.has_unflushed_changes()
+                or self._others_pending()
+                or file_signature(self.filepath) == doc.file_sig
+            )
+        ):
+            # Another view of the file already has it parsed (and up to date)
+            data = doc.full_data
         # Handle missing file
-        if not self.filepath.exists():
+        elif not self.filepath.exists():
             if self.create_file_content is None:
                 raise FileNotFoundError(f"File not found: {self.filepath}")
 
@@ -348,15 +1556,12 @@ class FileStore(SyncStore):
             initial_data = self.create_file_content()
             self.filepath.parent.mkdir(parents=True, exist_ok=True)
             content = self._file_dumper(initial_data, **self.dump_kwargs)
-            write_mode = "w" if "b" not in self.mode else "wb"
-            with open(self.filepath, write_mode) as f:
-                f.write(content)
+            self._write_file(content)
             data = initial_data
         else:
-            # Load existing file
-            with open(self.filepath, self.mode) as f:
-                content = f.read()
-            data = self._file_loader(content)
+            data = self._read_file()
+
+        self._full_data = data
 
         # Handle missing key_path
         try:
@@ -368,36 +1573,318 @@ class FileStore(SyncStore):
             # Create key_path with initial content
             initial_content = self.create_key_path_content()
             full_data = _set_nested(data, self.key_path, initial_content)
-
-            # Write back to file
-            content = self._file_dumper(full_data, **self.dump_kwargs)
-            write_mode = "w" if "b" not in self.mode else "wb"
-            with open(self.filepath, write_mode) as f:
-                f.write(content)
+            self._full_data = full_data
+            if self._others_pending():
+                # Writing now would write the pending changes of other views (say,
+                # half of a batch): ours are written with theirs instead
+                self._needs_flush = True
+            else:
+                content = self._file_dumper(full_data, **self.dump_kwargs)
+                self._write_file(content)
 
             return initial_content
 
+    def _repoint_views(self):
+        """Make the other views of the document use its current tree."""
+        for view in self._doc.views():
+            if view is self or view._data is None:
+                continue
+            section = _get_nested_or_none(self._full_data, view.key_path)
+            if section is not None and section is not view._data:
+                view._data = section
+                view._version += 1
+                view._needs_flush = False
+                view._changed_keys = set()
+                view._publish_snapshot()
+
+    def _others_pending(self) -> bool:
+        """Whether other views of the document have changes a reload would discard:
+        unflushed ones, or (since a batch on any view batches them all) a batch in
+        progress."""
+        others = [
+            view
+            for view in self._doc.views()
+            if view is not self and view._data is not None
+        ]
+        return bool(others) and (
+            self._batch_depth > 0 or any(view._needs_flush for view in others)
+        )
+
+    def reload(self):
+        """Reload data from the file, discarding unflushed changes.
+
+        Raises ``RuntimeError`` if other views sharing the document have unflushed
+        changes or are in a batch: reloading would discard their changes too.
+        """
+        with self._lock:
+            if self._others_pending():
+                raise RuntimeError(
+                    "Can't reload while other views of the file have unflushed "
+                    "changes or are in a batch: flush them first"
+                )
+            super().reload()
+
+    def refresh(self) -> bool:
+        """Reload the file if it changed on disk since we last read or wrote it.
+
+        Returns True if the store was reloaded. Nothing is reloaded while there are
+        unflushed local changes (or changes of views sharing the document, or a
+        batch on them), or if the file was removed.
+        """
+        with self._lock:
+            self._last_check_time = time.monotonic()
+            if (
+                self._data is None
+                or self._doc.has_unflushed_changes()
+                or self._others_pending()
+            ):
+                return False
+            sig = file_signature(self.filepath)
+            if sig is None or sig == self._file_sig:
+                return False
+            self.reload()
+        for view in self._doc.views():
+            if view.on_reload is not None and view._data is not None:
+                view.on_reload(view)
+        return True
+
+    def _refresh_if_stale(self):
+        if self.check_interval is not None and (
+            time.monotonic() - self._last_check_time >= self.check_interval
+        ):
+            self.refresh()
+
+    def version(self):
+        """Return a token combining in-memory mutations with the file's stat info.
+
+        The token changes when the store is mutated or when the file's
+        ``(mtime_ns, size, inode)`` signature changes.
+        """
+        return (self._version, file_signature(self.filepath))
+
+    def flush(self):
+        """Sync data to the file if changes exist (in this or in a view sharing the
+        document)."""
+        with self._lock:
+            others = [
+                view
+                for view in self._doc.views()
+                if view is not self and view._needs_flush
+            ]
+            if others:
+                self._ensure_loaded()
+                self._needs_flush = True  # Their changes are in the document we write
+            super().flush()
+            for view in others:
+                view._mark_flushed()
+
+    def clear(self):
+        """Remove all items, syncing once."""
+        if self.merge:
+            self._ensure_loaded()  # Merging needs the version of the data we cleared
+        super().clear()
+
     def _dump_to_file(self, section_data: dict) -> None:
         """Write data to file, updating only the section specified by key_path."""
-        if not self.key_path:
+        with self._locked(exclusive=True):
+            if self.merge and file_signature(self.filepath) != self._file_sig:
+                self._merge_external_changes(section_data)
+            self._merge_and_write(section_data)
+        if self.merge:
+            self._base = copy.deepcopy(section_data)
+
+    def _merge_external_changes(self, section_data: dict) -> None:
+        """Rebase our changed keys onto the section as it now is on disk (in place)."""
+        previous_sig = self._file_sig
+        fresh_full = self._read_file()
+        try:
+            theirs_section = _get_nested(fresh_full, self.key_path)
+        except (KeyError, TypeError):
+            theirs_section = {}
+        base = self._base or {}
+        merged = dict(theirs_section)
+        try:
+            for key in self._changed_keys:
+                ours = section_data.get(key, DELETED)
+                base_value = base.get(key, DELETED)
+                theirs = theirs_section.get(key, DELETED)
+                if theirs == base_value or theirs == ours:
+                    value = ours
+                else:
+                    value = self._resolve_conflict(key, base_value, ours, theirs)
+                if value is DELETED:
+                    merged.pop(key, None)
+                else:
+                    merged[key] = value
+        except BaseException:
+            self._file_sig = previous_sig  # so the next flush merges again
+            raise
+        if self.key_path:
+            self._full_data = fresh_full
+        # Update in place: section_data is self._data (and part of self._full_data)
+        section_data.clear()
+        section_data.update(merged)
+        self._version += 1
+
+    def _resolve_conflict(self, key, base, ours, theirs):
+        if callable(self.on_conflict):
+            return self.on_conflict(key, base, ours, theirs)
+        elif self.on_conflict == "ours":
+            return ours
+        elif self.on_conflict == "theirs":
+            return theirs
+        elif self.on_conflict == "raise":
+            raise MergeConflict(key, base, ours, theirs)
+        raise ValueError(f"Unknown on_conflict policy: {self.on_conflict!r}")
+
+    def _merge_and_write(self, section_data: dict) -> None:
+        # The sections to write: ours, and those of views sharing the document that
+        # have unflushed changes
+        sections = [(self.key_path, section_data)] + [
+            (view.key_path, view._data)
+            for view in self._doc.views()
+            if view is not self and view._needs_flush
+        ]
+        roots = [section for key_path, section in sections if not key_path]
+        if roots:
             # No key_path, write entire data
-            content = self._file_dumper(section_data, **self.dump_kwargs)
+            full_data = roots[0]
         else:
             # Have key_path, need to merge with full file content
-            with open(self.filepath, self.mode) as f:
-                full_data = self._file_loader(f.read())
-            full_data = _set_nested(full_data, self.key_path, section_data)
-            content = self._file_dumper(full_data, **self.dump_kwargs)
+            full_data = self._current_full_data()
+        for key_path, section in sections:
+            if _get_nested_or_none(full_data, key_path) is not section:
+                full_data = _set_nested(full_data, key_path, section)
+        content = self._file_dumper(full_data, **self.dump_kwargs)
+        self._write_file(content)
+        self._full_data = full_data
+        self._repoint_views()
+
+    def _current_full_data(self) -> dict:
+        """Return the full document, only re-reading the file if it changed on disk."""
+        if self._full_data is None or file_signature(self.filepath) != self._file_sig:
+            self._full_data = self._read_file()
+        return self._full_data
+
+    def _read_file(self) -> Any:
+        """Read and parse the whole file, recording its signature."""
+        with open(self.filepath, self._read_mode) as f:
+            st = os.fstat(f.fileno())
+            sig = (st.st_mtime_ns, st.st_size, st.st_ino)
+            if self.parse_cache is not None:
+                cached = self.parse_cache.get(
+                    self.filepath, sig, self._file_loader, _MISSING
+                )
+                if cached is not _MISSING:
+                    data, self._doc.content_digest = cached
+                    self._file_sig = sig
+                    self.stats["parse_cache_hits"] += 1
+                    return data
+            if self._should_mmap(st.st_size):
+                # Parse from the page cache, without copying the file into a string
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    data = self._buffer_loader(buffer)
+                    digest = _content_digest(buffer) if self.skip_unchanged else None
+                self.stats["mmap_reads"] += 1
+            else:
+                content = self._read_content(f)
+                data = self._file_loader(content)
+                digest = _content_digest(content) if self.skip_unchanged else None
+        if self.parse_cache is not None:
+            self.parse_cache.set(self.filepath, sig, self._file_loader, (data, digest))
+        self._file_sig = sig
+        self._doc.content_digest = digest
+        return data
 
-        write_mode = "w" if "b" not in self.mode else "wb"
-        with open(self.filepath, write_mode) as f:
-            f.write(content)
+    def _read_section(self) -> Any:
+        """Read the file, parsing only our section (``_MISSING`` if there's none)."""
+        try:
+            with open(self.filepath, self._read_mode) as f:
+                st = os.fstat(f.fileno())
+                content = self._read_content(f)
+        except FileNotFoundError:
+            return _MISSING
+        try:
+            section = self._path_loader(content, self.key_path)
+        except KeyError:
+            return _MISSING  # The full load will report (or create) the key path
+        self._full_data = None  # Not parsed: read again if needed to write
+        self._file_sig = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if self.skip_unchanged:
+            self._doc.content_digest = _content_digest(content)
+        self.stats["partial_loads"] += 1
+        return section
+
+    def _read_content(self, f):
+        """Read the (decompressed) content of the open file ``f``."""
+        if self._compression is None:
+            return f.read()
+        content = self._compression[1](f.read())
+        return content if "b" in self.mode else content.decode("utf-8")
+
+    def _should_mmap(self, size: int) -> bool:
+        return (
+            self._buffer_loader is not None
+            and self.mmap_threshold is not None
+            and size >= max(self.mmap_threshold, 1)  # empty files can't be mapped
+        )
+
+    def _write_file(self, content) -> None:
+        """Write serialized content to the file (atomically, unless disabled)."""
+        digest = None
+        if self.skip_unchanged:
+            digest = _content_digest(content)
+            if (
+                digest == self._doc.content_digest
+                and self._file_sig is not None
+                and file_signature(self.filepath) == self._file_sig
+            ):
+                self.stats["skipped_writes"] += 1
+                return
+        self._doc.content_digest = digest
+        if self._compression is not None:
+            if isinstance(content, str):
+                content = content.encode("utf-8")
+            content = self._compression[0](content)
+        if self.atomic:
+            self._file_sig = atomic_write(
+                self.filepath, content, durability=self.durability
+            )
+        else:
+            write_mode = "wb" if isinstance(content, bytes) else "w"
+            with open(self.filepath, write_mode) as f:
+                f.write(content)
+            self._file_sig = file_signature(self.filepath)
 
     def __repr__(self):
         key_path_str = f", key_path={self.key_path!r}" if self.key_path else ""
         return f"{self.__class__.__name__}({self.filepath!r}{key_path_str})"
 
 
+def _watch_file_store(store: FileStore):
+    """Refresh ``store`` whenever its file changes, for as long as the store lives."""
+    from config2py.watch import watch_path  # only needed (and imported) if watching
+
+    store_ref = weakref.ref(store)
+
+    def refresh_store(path):
+        store = store_ref()
+        if store is not None:
+            store.refresh()
+
+    handle = watch_path(store.filepath, refresh_store)
+    weakref.finalize(store, handle.cancel)
+    return handle
+
+
+# FileStore options that JsonStore passes through (the others it sets itself)
+_JSON_STORE_PASSTHROUGH = frozenset(
+    name
+    for name, param in inspect.signature(FileStore.__init__).parameters.items()
+    if param.kind is param.KEYWORD_ONLY
+) - {"key_path", "loader", "dumper", "mode", "dump_kwargs"}
+
+
 class JsonStore(FileStore):
     """
     A FileStore specialized for JSON files.
@@ -409,7 +1896,8 @@ class JsonStore(FileStore):
         key_path: Optional nested path to operate on
         indent: JSON indentation (default: 2)
         ensure_ascii: Whether to escape non-ASCII (default: False)
-        **dump_kwargs: Additional kwargs for json.dumps
+        **dump_kwargs: Additional kwargs for json.dumps. Keyword arguments that are
+            ``FileStore`` options (e.g. ``flush_delay``) are passed on to ``FileStore``.
     """
 
     def __init__(
@@ -421,6 +1909,11 @@ class JsonStore(FileStore):
         ensure_ascii: bool = False,
         **dump_kwargs,
     ):
+        store_kwargs = {
+            name: dump_kwargs.pop(name)
+            for name in _JSON_STORE_PASSTHROUGH
+            if name in dump_kwargs
+        }
         dump_kwargs.setdefault("indent", indent)
         dump_kwargs.setdefault("ensure_ascii", ensure_ascii)
 
@@ -431,4 +1924,188 @@ class JsonStore(FileStore):
             key_path=key_path,
             mode="r",
             dump_kwargs=dump_kwargs,
+            **store_kwargs,
+        )
+
+
+class JournalStore(SyncStore):
+    """
+    A SyncStore persisted as a JSON snapshot plus an append-only journal.
+
+    Each flush appends a single JSON line, holding only the keys set and deleted
+    since the previous flush, to a journal file next to the snapshot, so small
+    changes to a large store cost a small append rather than a rewrite of the whole
+    document. Loading reads the snapshot and replays the journal over it.
+
+    When the journal grows past ``compact_min_size`` bytes and past
+    ``compact_ratio`` times the size of the snapshot, the store is compacted: the
+    snapshot is rewritten (atomically) with the current data and the journal is
+    emptied. A crash between those two steps is harmless, since replaying the
+    journal over a snapshot that already contains its changes gives the same data.
+
+    A crash in the middle of an append leaves a truncated last line: it is ignored
+    (and removed) when loading, losing only that flush's changes. Any other
+    malformed line raises a ``ValueError``.
+
+    The store assumes it's the only writer of its files.
+
+    Args:
+        filepath: Path of the JSON snapshot (supports ~ expansion). A missing
+            snapshot is an empty store.
+        journal_path: Path of the journal (default: ``<filepath>.journal``)
+        compact_min_size: Journal size (in bytes) under which it is never compacted
+        compact_ratio: Compact once the journal is this many times bigger than the
+            snapshot (and bigger than ``compact_min_size``)
+        durability: As for ``atomic_write``: ``'none'`` (default) leaves appends
+            to the OS, ``'flush'`` fsyncs each append (and the snapshot, when
+            compacting) so that a flushed change survives a power loss, and
+            ``'fsync'`` also fsyncs the directory when the journal is created.
+        flush_delay, max_flush_delay, max_pending: Write-behind settings
+            (see ``SyncStore``).
+        batch_scope: How ``with`` blocks behave across threads (see ``SyncStore``).
+        snapshots: Whether to publish snapshots (see ``SyncStore.snapshot``)
+        lazy: If True, don't read the files until the data is needed (see
+            ``SyncStore``)
+        key_sep: Separator of paths in keys, to access nested values directly
+            (see ``SyncStore``)
+
+    Example:
+        >>> import tempfile
+        >>> with tempfile.TemporaryDirectory() as tmpdir:
+        ...     path = os.path.join(tmpdir, 'store.json')
+        ...     store = JournalStore(path)
+        ...     store['a'] = 1
+        ...     with store:
+        ...         store['b'] = {'c': 2}
+        ...         del store['a']
+        ...     print(open(path + '.journal').read(), end='')
+        ...     print(dict(JournalStore(path)))
+        {"set":{"a":1}}
+        {"set":{"b":{"c":2}},"del":["a"]}
+        {'b': {'c': 2}}
+    """
+
+    def __init__(
+        self,
+        filepath: Union[str, Path],
+        *,
+        journal_path: Union[str, Path, None] = None,
+        compact_min_size: int = 64 * 1024,
+        compact_ratio: float = 1.0,
+        durability: Durability = "none",
+        flush_delay: Optional[float] = None,
+        max_flush_delay: Optional[float] = None,
+        max_pending: Optional[int] = None,
+        batch_scope: BatchScope = "shared",
+        snapshots: bool = False,
+        lazy: bool = False,
+        key_sep: Optional[str] = None,
+    ):
+        self.filepath = Path(filepath).expanduser()
+        if journal_path is None:
+            journal_path = self.filepath.with_name(self.filepath.name + ".journal")
+        self.journal_path = Path(journal_path).expanduser()
+        self.compact_min_size = compact_min_size
+        self.compact_ratio = compact_ratio
+        self.durability = _validate_durability(durability)
+        self._snapshot_size = 0
+        self._journal_size = 0
+        self.stats = {"journal_appends": 0, "compactions": 0}
+        super().__init__(
+            loader=self._load_from_files,
+            dumper=self._write_snapshot,
+            patch_dumper=self._append_to_journal,
+            flush_delay=flush_delay,
+            max_flush_delay=max_flush_delay,
+            max_pending=max_pending,
+            batch_scope=batch_scope,
+            snapshots=snapshots,
+            lazy=lazy,
+            key_sep=key_sep,
         )
+
+    def _load_from_files(self) -> dict:
+        try:
+            content = self.filepath.read_bytes()
+        except FileNotFoundError:
+            content = b""
+        data = json.loads(content) if content.strip() else {}
+        self._snapshot_size = len(content)
+        self._journal_size = self._replay_journal(data)
+        return data
+
+    def _replay_journal(self, data: dict) -> int:
+        """Apply the journal's records to ``data`` (in place), returning its size."""
+        try:
+            content = self.journal_path.read_bytes()
+        except FileNotFoundError:
+            return 0
+        # Anything after the last newline is an append that didn't complete
+        end = content.rfind(b"\n") + 1
+        for lineno, line in enumerate(content[:end].splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                data.update(record.get("set", {}))
+                for key in record.get("del", ()):
+                    data.pop(key, None)
+            except (ValueError, TypeError, AttributeError) as e:
+                raise ValueError(
+                    f"Malformed record on line {lineno} of {self.journal_path}: {e}"
+                ) from e
+        if end < len(content):
+            # Drop the torn record, so the next append starts on a line of its own
+            os.truncate(self.journal_path, end)
+        return end
+
+    def _append_to_journal(self, updated: dict, deleted: set) -> None:
+        record = {}
+        if updated:
+            record["set"] = updated
+        if deleted:
+            record["del"] = sorted(deleted)
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        line = line.encode("utf-8")
+        fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+        try:
+            written = 0
+            while written < len(line):
+                written += os.write(fd, line[written:])
+            if self.durability != "none":
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        if self.durability == "fsync" and self._journal_size == 0:
+            _fsync_dir(os.path.dirname(os.path.realpath(self.journal_path)))
+        self._journal_size += len(line)
+        self.stats["journal_appends"] += 1
+        if self._journal_size >= max(
+            self.compact_min_size, self.compact_ratio * self._snapshot_size
+        ):
+            self._write_snapshot(self._data)
+
+    def _write_snapshot(self, data: dict) -> None:
+        """Write all of ``data`` to the snapshot, and empty the journal."""
+        content = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        atomic_write(self.filepath, content, durability=self.durability)
+        if self.durability != "none":
+            # The rename must be durable before the journal it replaces is emptied
+            _fsync_dir(os.path.dirname(self.filepath))
+        self._snapshot_size = len(content)
+        try:
+            os.truncate(self.journal_path, 0)
+        except FileNotFoundError:
+            pass
+        self._journal_size = 0
+        self.stats["compactions"] += 1
+
+    def compact(self) -> None:
+        """Flush, then fold the journal into the snapshot."""
+        self._ensure_loaded()
+        with self._lock:
+            self.flush()
+            self._write_snapshot(self._data)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.filepath!r})"
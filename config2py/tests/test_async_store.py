@@ -0,0 +1,140 @@
+"""Tests for the async_store module."""
+
+import asyncio
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from config2py.async_store import AsyncSyncStore, AsyncFileStore, AsyncJsonStore
+
+
+def test_async_store_doesnt_block_the_loop():
+    """A slow dumper runs in the executor while the loop keeps running."""
+    loop_thread = []
+    dump_threads = []
+
+    def dumper(data):
+        dump_threads.append(threading.get_ident())
+        time.sleep(0.2)
+
+    store = AsyncSyncStore(dict, dumper)
+
+    async def ticker(ticks, stop):
+        while not stop.is_set():
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        loop_thread.append(threading.get_ident())
+        ticks, stop = [], asyncio.Event()
+        task = asyncio.create_task(ticker(ticks, stop))
+        await store.aset("a", 1)
+        stop.set()
+        await task
+        return ticks
+
+    ticks = asyncio.run(main())
+    assert len(ticks) >= 5  # The loop ticked while the dumper slept
+    assert dump_threads and dump_threads[0] != loop_thread[0]
+    assert dict(store) == {"a": 1}
+
+
+def test_async_store_max_pending_flushes_in_the_executor():
+    """Reaching max_pending flushes right away, but not on the event loop thread."""
+    loop_thread = []
+    dump_threads = []
+    store = AsyncSyncStore(
+        dict,
+        lambda data: dump_threads.append(threading.get_ident()),
+        flush_delay=10,
+        max_pending=2,
+    )
+
+    async def main():
+        loop_thread.append(threading.get_ident())
+        await store.aset("a", 1)
+        assert dump_threads == []  # Left to the background flusher
+        await store.aset("b", 2)
+
+    asyncio.run(main())
+    assert len(dump_threads) == 1
+    assert dump_threads[0] != loop_thread[0]
+    assert not store._needs_flush
+
+
+def test_async_store_batches():
+    saved = []
+    store = AsyncSyncStore(lambda: {"x": 0}, lambda data: saved.append(dict(data)))
+    assert store._data is None  # Async stores are lazy
+
+    async def main():
+        async with store:
+            await store.aupdate({"a": 1}, b=2)
+            async with store:
+                await store.aset("c", 3)
+            assert saved == []  # Only the outermost batch flushes
+            await store.adel("x")
+        assert await store.acontains("a")
+        assert not await store.acontains("x")
+        assert await store.aget("x", "default") == "default"
+        try:
+            await store.adel("x")
+            assert False, "Should have raised KeyError"
+        except KeyError:
+            pass
+
+    asyncio.run(main())
+    assert saved == [{"a": 1, "b": 2, "c": 3}]
+
+
+def test_async_file_store_serializes_writes():
+    """Concurrent writers (through different stores of a file) don't interleave."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = Path(tmpdir) / "config.json"
+        filepath.write_text(json.dumps({"a": {}, "b": {}}))
+        writing = []
+        overlaps = []
+
+        def dumper(data, **kwargs):
+            if writing:
+                overlaps.append(True)
+            writing.append(True)
+            time.sleep(0.005)
+            writing.pop()
+            return json.dumps(data)
+
+        stores = [
+            AsyncFileStore(filepath, key_path=k, loader=json.loads, dumper=dumper)
+            for k in "ab"
+        ]
+
+        async def main():
+            await asyncio.gather(
+                *(store.aset(f"k{i}", i) for i in range(10) for store in stores)
+            )
+
+        asyncio.run(main())
+        assert not overlaps
+        expected = {f"k{i}": i for i in range(10)}
+        assert json.loads(filepath.read_text()) == {"a": expected, "b": expected}
+
+
+def test_async_json_store():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = Path(tmpdir) / "config.json"
+        filepath.write_text(json.dumps({"a": 1}))
+
+        async def main():
+            store = AsyncJsonStore(filepath)
+            assert await store.aget("a") == 1
+            await store.aset("b", 2)
+            filepath.write_text(json.dumps({"a": 10}))
+            assert await store.arefresh()
+            assert await store.aget("a") == 10
+            return store
+
+        store = asyncio.run(main())
+        assert dict(store) == {"a": 10}
+        assert store.dump_kwargs["indent"] == 2
@@ -0,0 +1,33 @@
+"""Tests for the version tokens of sources (base.source_version and friends)."""
+
+import os
+import tempfile
+from pathlib import Path
+
+from dol import TextFiles
+
+from config2py.base import source_version
+from config2py.util import envvar
+
+
+def test_source_version_of_folders_and_envvar():
+    """Test that overwriting a file of a folder store, or an environment variable,
+    changes their version tokens."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        files = TextFiles(tmpdir)
+        files["k"] = "v1"
+        version = source_version(files)
+        assert source_version(files) == version
+        files["k"] = "v2"  # Same size: the folder's own stat doesn't change
+        os.utime(Path(tmpdir) / "k", ns=(1, 1))  # (in case mtimes are coarse)
+        assert source_version(files) != version
+
+    name = "CONFIG2PY_TEST_VERSION_VAR"
+    os.environ[name] = "a"
+    try:
+        version = envvar.version()
+        assert envvar.version() == version
+        os.environ[name] = "b"  # Directly, not through envvar
+        assert envvar.version() != version
+    finally:
+        del os.environ[name]
@@ -310,6 +310,40 @@ class TestCustomCodecRegistration:
         )
 
 
+class TestCompressedCodecs:
+    """Test codecs for compressed files (e.g. config.json.gz)."""
+
+    def test_compressed_roundtrip(self):
+        """Test encode -> decode roundtrip through each compression."""
+        import bz2
+        import gzip
+        import lzma
+
+        data = {'name': 'test', 'nested': {'key': 'value'}}
+        decompressors = {'gz': gzip.decompress, 'bz2': bz2.decompress, 'xz': lzma.decompress}
+        for ext, decompress in decompressors.items():
+            key = f'config.json.{ext}'
+            encoded = codecs.encode_by_extension(key, data)
+            assert codecs.decode_by_extension('config.json', decompress(encoded)) == data
+            assert codecs.decode_by_extension(key, encoded) == data
+
+    def test_compression_level(self):
+        """Test that the compression level is used, and gzip output is deterministic."""
+        data = [f'line {i % 13}' for i in range(2000)]
+        fast = codecs.encode_by_extension('data.lsv.gz', data, compression_level=1)
+        best = codecs.encode_by_extension('data.lsv.gz', data, compression_level=9)
+        assert len(best) <= len(fast)
+        assert best == codecs.encode_by_extension('data.lsv.gz', data, compression_level=9)
+        assert codecs.decode_by_extension('data.lsv.gz', fast) == data
+
+    def test_compressed_unknown_inner_extension(self):
+        """Test that a compressed file needs a codec for its inner extension."""
+        with pytest.raises(ValueError, match="No decoder registered"):
+            codecs.decode_by_extension('file.unknown.gz', b'')
+        with pytest.raises(ValueError, match="No encoder registered"):
+            codecs.encode_by_extension('file.gz', {})
+
+
 class TestErrorHandling:
     """Test error handling."""
 
@@ -0,0 +1,90 @@
+"""Tests for the directory_store module."""
+
+import json
+import tempfile
+from pathlib import Path
+
+from config2py.directory_store import DirectoryStore
+
+
+def test_directory_store():
+    """Test merging the files of a directory, with precedence and write routing."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        conf_d = Path(tmpdir) / "conf.d"
+        conf_d.mkdir()
+
+        def write(name, data):
+            (conf_d / name).write_text(json.dumps(data))
+
+        def read(name):
+            return json.loads((conf_d / name).read_text())
+
+        write("10-defaults.json", {"host": "localhost", "port": 8080, "debug": False})
+        write("50-local.json", {"port": 9000})
+        (conf_d / "README.txt").write_text("Not a config file")
+        write(".hidden.json", {"host": "hidden"})
+
+        store = DirectoryStore(conf_d)
+        assert dict(store) == {"host": "localhost", "port": 9000, "debug": False}
+        assert store.owner("port") == conf_d / "50-local.json"
+        assert store.stats["loads"] == 2
+
+        # Writes go to the owning file, new keys to the highest precedence file
+        store["host"] = "example.com"
+        store["new"] = 1
+        assert read("10-defaults.json")["host"] == "example.com"
+        assert read("50-local.json") == {"port": 9000, "new": 1}
+
+        # Deleting removes the key from all files
+        del store["port"]
+        assert "port" not in store
+        assert "port" not in read("10-defaults.json")
+        assert "port" not in read("50-local.json")
+
+        # Batches write each changed file once
+        mtimes = {p.name: p.stat().st_mtime_ns for p in conf_d.glob("*.json")}
+        with store:
+            store["debug"] = True
+            store["host"] = "example.org"
+            assert read("10-defaults.json")["debug"] is False
+        assert read("10-defaults.json")["debug"] is True
+        assert (conf_d / "50-local.json").stat().st_mtime_ns == mtimes["50-local.json"]
+
+        # Refreshing re-parses only the files that changed, and picks up new ones
+        assert not store.refresh()
+        write("50-local.json", {"port": 1, "host": "local"})
+        write("90-override.json", {"debug": "verbose"})
+        loads = store.stats["loads"]
+        assert store.refresh()
+        assert store.stats["loads"] == loads + 2
+        assert store["port"] == 1 and store["host"] == "local"
+        assert store["debug"] == "verbose"
+        (conf_d / "90-override.json").unlink()
+        assert store.refresh()
+        assert store["debug"] is True
+
+        # Custom precedence, file selection and default file
+        store = DirectoryStore(
+            conf_d,
+            "*.json",
+            sort_key=lambda path: [-ord(c) for c in path.name],  # First name wins
+            default_file="00-new.json",
+        )
+        assert store["host"] == "example.org"
+        store["added"] = True
+        assert read("00-new.json") == {"added": True}
+        assert store.owner("added") == conf_d / "00-new.json"
+
+        # Misconfigurations are reported upfront
+        for kwargs in (
+            dict(pattern="*.yaml", default_file="99-local.json"),
+            dict(default_file="99-local.txt"),
+            dict(lazy=False),
+            dict(create_file_content=dict),
+        ):
+            try:
+                DirectoryStore(conf_d, **kwargs)
+                assert False, f"Should have raised for {kwargs}"
+            except (ValueError, TypeError):
+                pass
+        assert not (conf_d / "99-local.json").exists()
@@ -0,0 +1,106 @@
+"""Tests for the parse_cache module."""
+
+import datetime
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from config2py import codecs
+from config2py.parse_cache import ParseCache, codec_version
+from config2py.sync_store import file_signature
+
+
+def _read_text(path):
+    return Path(path).read_text()
+
+
+def test_parse_cache_hits_until_the_file_changes():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = Path(tmpdir) / "config.json"
+        filepath.write_text('{"a": 1}')
+        cache = ParseCache(Path(tmpdir) / "cache")
+        calls = []
+
+        def loads(content):
+            calls.append(content)
+            return json.loads(content)
+
+        assert cache.load(filepath, loads, read=_read_text) == {"a": 1}
+        assert cache.load(filepath, loads, read=_read_text) == {"a": 1}
+        assert len(calls) == 1
+        assert cache.stats == {"hits": 1, "misses": 1}
+
+        # Another instance (e.g. another process) uses the same entries
+        assert ParseCache(cache.rootdir).load(filepath, loads, read=_read_text) == {
+            "a": 1
+        }
+        assert len(calls) == 1
+
+        # Changing the file invalidates its entry
+        filepath.write_text('{"a": 22}')
+        assert cache.load(filepath, loads, read=_read_text) == {"a": 22}
+        assert len(calls) == 2
+
+        # So does changing the codec version
+        assert cache.load(filepath, loads, read=_read_text, version="v2") == {"a": 22}
+        assert len(calls) == 3
+
+        # Values are fresh copies
+        value = cache.load(filepath, loads, read=_read_text)
+        value["a"] = 0
+        assert cache.load(filepath, loads, read=_read_text) == {"a": 22}
+
+
+def test_parse_cache_entries():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = Path(tmpdir) / "config.yaml"
+        filepath.write_text("when: 2024-01-01")
+        cache = ParseCache(Path(tmpdir) / "cache")
+        sig = file_signature(filepath)
+
+        # Values that marshal can't serialize are pickled
+        value = {"when": datetime.date(2024, 1, 1)}
+        assert cache.set(filepath, sig, "codec", value)
+        assert cache.get(filepath, sig, "codec") == value
+        assert cache.get(filepath, sig, "other_codec", default="miss") == "miss"
+        assert cache.get(filepath, (0, 0), "codec", default="miss") == "miss"
+
+        # Unserializable values are just not cached
+        assert not cache.set(filepath, sig, "codec", {"f": lambda: None})
+
+        # Corrupt entries are misses
+        (entry_path,) = cache.rootdir.glob("*.cache")
+        entry_path.write_bytes(b"garbage")
+        assert cache.get(filepath, sig, "codec", default="miss") == "miss"
+
+        cache.clear()
+        assert not list(cache.rootdir.glob("*.cache"))
+
+
+def test_codec_version():
+    assert codec_version(json.loads) == codec_version(json.loads)
+    assert codec_version(json.loads) != codec_version(json.dumps)
+
+    def decoder(data):
+        return data
+
+    def other_decoder(data):
+        return data[::-1]
+
+    other_decoder.__qualname__ = decoder.__qualname__
+    assert codec_version(decoder) != codec_version(other_decoder)
+
+
+def test_decode_file_with_parse_cache():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "config.json.gz")
+        data = {"key": "value", "nested": {"a": [1, 2]}}
+        with open(filepath, "wb") as f:
+            f.write(codecs.encode_by_extension(filepath, data))
+
+        cache = ParseCache(os.path.join(tmpdir, "cache"))
+        assert codecs.decode_file(filepath) == data
+        assert codecs.decode_file(filepath, parse_cache=cache) == data
+        assert codecs.decode_file(filepath, parse_cache=cache) == data
+        assert cache.stats == {"hits": 1, "misses": 1}
@@ -0,0 +1,32 @@
+"""Tests for the s_configparser module."""
+
+import os
+import tempfile
+
+from config2py.s_configparser import ConfigStore
+
+
+def test_config_store_version():
+    """Test that the version token changes with edits of sections, not only of the
+    top level."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "config.ini")
+        with open(filepath, "w") as f:
+            f.write("[sec]\nk = 1\n")
+        s = ConfigStore(filepath)
+        version = s.version()
+        assert s.version() == version
+
+        s["sec"]["k"] = "2"
+        assert s.version() != version
+        version = s.version()
+        del s["sec"]["k"]
+        assert s.version() != version
+        version = s.version()
+        s["other"] = {"a": "b"}
+        assert s.version() != version
+
+    s = ConfigStore({"sec": {"k": "1"}})
+    version = s.version()
+    s["sec"].update({"k": "2"})
+    assert s.version() != version
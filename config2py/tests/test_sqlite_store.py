@@ -0,0 +1,46 @@
+"""Tests for the sqlite_store module."""
+
+import tempfile
+from pathlib import Path
+
+from config2py.sqlite_store import SqliteStore
+
+
+def test_sqlite_store():
+    """Test SqliteStore: per-key persistence, namespaces and transactions."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "configs.db"
+        store = SqliteStore(path, key_path="app.servers")
+        other = SqliteStore(path, key_path=("app", "servers"))  # same namespace
+        elsewhere = SqliteStore(path, key_path="app.users")
+
+        store["b"] = {"port": 1}
+        store["a"] = [1, 2]
+        store["b"] = {"port": 2}  # keeps its position
+        assert list(other) == ["b", "a"]
+        assert other["b"] == {"port": 2}
+        assert len(other) == 2 and "a" in other and "c" not in other
+        assert dict(elsewhere) == {}
+
+        # Inside a with block, changes are committed together on exit
+        version = other.version()
+        with store:
+            store["c"] = 3
+            del store["a"]
+            assert "c" in store
+            assert "c" not in other and "a" in other
+        assert dict(other) == {"b": {"port": 2}, "c": 3}
+        assert other.version() != version  # committed by another connection
+
+        try:
+            del store["a"]
+            assert False, "Should have raised KeyError"
+        except KeyError:
+            pass
+
+        elsewhere.update(alice=1, bob=2)
+        store.clear()
+        assert dict(other) == {}
+        assert dict(elsewhere) == {"alice": 1, "bob": 2}
+        for s in (store, other, elsewhere):
+            s.close()
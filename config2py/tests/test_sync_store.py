@@ -2,8 +2,15 @@
 
 import tempfile
 import json
+from functools import reduce
 from pathlib import Path
-from config2py.sync_store import SyncStore, FileStore, JsonStore, register_extension
+from config2py.sync_store import (
+    SyncStore,
+    FileStore,
+    JsonStore,
+    JournalStore,
+    register_extension,
+)
 
 try:
     import pytest
@@ -279,6 +286,1060 @@ def test_store_repr():
         Path(temp_file).unlink()
 
 
+def test_version_tokens():
+    """Test that version tokens change on mutation and on external file edits."""
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
+        f.write('{"key": "value"}')
+        temp_file = f.name
+
+    try:
+        store = FileStore(temp_file)
+        v0 = store.version()
+        assert store.version() == v0  # stable when nothing changes
+
+        store["key"] = "other"
+        v1 = store.version()
+        assert v1 != v0
+
+        # External edit (different size) changes the token too
+        Path(temp_file).write_text('{"key": "changed externally"}')
+        assert store.version() != v1
+
+    finally:
+        Path(temp_file).unlink()
+
+
+def test_sync_store_bulk_operations_flush_once():
+    """Test that bulk MutableMapping methods sync exactly once."""
+    data_holder = [{"x": 0}]
+    sync_count = [0]
+
+    def dumper(data):
+        data_holder[0] = data.copy()
+        sync_count[0] += 1
+
+    store = SyncStore(lambda: data_holder[0].copy(), dumper)
+
+    store.update({f"k{i}": i for i in range(50)}, extra=True)
+    assert sync_count[0] == 1
+    assert data_holder[0]["k42"] == 42 and data_holder[0]["extra"] is True
+
+    store.update({})  # nothing to do, nothing to write
+    assert sync_count[0] == 1
+
+    assert store.pop("k0") == 0
+    assert store.pop("k0", "dflt") == "dflt"
+    assert sync_count[0] == 2
+
+    assert store.setdefault("x", 1) == 0  # existing key: no write
+    assert store.setdefault("new", 1) == 1
+    assert sync_count[0] == 3
+
+    key, value = store.popitem()
+    assert key not in data_holder[0]
+    assert sync_count[0] == 4
+
+    store.clear()
+    assert sync_count[0] == 5
+    assert data_holder[0] == {}
+
+    store.clear()  # already empty
+    assert sync_count[0] == 5
+
+    with store:  # bulk operations also defer inside a with block
+        store.update(a=1, b=2)
+        store.pop("a")
+    assert sync_count[0] == 6
+    assert data_holder[0] == {"b": 2}
+
+
+def test_sync_store_write_behind():
+    """Test debounced background flushing."""
+    import time
+    from config2py.sync_store import _flush_scheduler
+
+    data_holder = [{}]
+    sync_count = [0]
+
+    def dumper(data):
+        data_holder[0] = data.copy()
+        sync_count[0] += 1
+
+    store = SyncStore(lambda: {}, dumper, flush_delay=0.05)
+    for i in range(20):
+        store["counter"] = i
+    assert sync_count[0] == 0  # coalesced, not written yet
+
+    deadline = time.monotonic() + 5
+    while sync_count[0] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sync_count[0] == 1
+    assert data_holder[0] == {"counter": 19}
+
+    # flush() forces a write, and nothing is left to do in the background
+    store["a"] = 1
+    store.flush()
+    assert sync_count[0] == 2
+    time.sleep(0.1)
+    assert sync_count[0] == 2
+
+    # max_pending bounds the number of unflushed mutations
+    store = SyncStore(lambda: {}, dumper, flush_delay=10, max_pending=3)
+    store["a"] = 1
+    store["b"] = 2
+    assert sync_count[0] == 2
+    store["c"] = 3
+    assert sync_count[0] == 3
+
+    # What is registered to run at interpreter exit flushes pending changes
+    store["d"] = 4
+    _flush_scheduler.flush_all()
+    assert sync_count[0] == 4
+    assert data_holder[0] == {"a": 1, "b": 2, "c": 3, "d": 4}
+
+
+def test_sync_store_failed_background_flush_is_retried():
+    """A store whose background flush fails isn't forgotten by the flusher."""
+    import time
+    import warnings
+    from config2py.sync_store import _flush_scheduler
+
+    attempts = []
+    saved = []
+
+    def dumper(data):
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise OSError("disk full")
+        saved.append(dict(data))
+
+    store = SyncStore(lambda: {}, dumper, flush_delay=0.02)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        store["a"] = 1
+        deadline = time.monotonic() + 5
+        while not attempts and time.monotonic() < deadline:
+            time.sleep(0.005)
+        # Whether or not the retry already happened, flush_all covers the store
+        _flush_scheduler.flush_all()
+    assert saved == [{"a": 1}]
+    assert not store._needs_flush
+
+
+def test_json_store_passes_store_options():
+    """Test that JsonStore forwards FileStore options instead of dump kwargs."""
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
+        f.write("{}")
+        temp_file = f.name
+
+    try:
+        store = JsonStore(temp_file, flush_delay=10, sort_keys=True)
+        assert store.flush_delay == 10
+        assert store.dump_kwargs["sort_keys"] is True
+        assert "flush_delay" not in store.dump_kwargs
+        store["b"] = 1
+        store["a"] = 2
+        store.flush()
+        assert json.loads(Path(temp_file).read_text()) == {"a": 2, "b": 1}
+
+    finally:
+        Path(temp_file).unlink()
+
+
+def test_file_store_atomic_writes():
+    """Test that FileStore writes through a temp file, keeping permissions."""
+    import os
+    import stat
+    from unittest import mock
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = Path(tmpdir) / "state.json"
+        filepath.write_text('{"a": 1}')
+        os.chmod(filepath, 0o640)
+
+        store = FileStore(filepath, durability="fsync")
+        inode_before = filepath.stat().st_ino
+        store["b"] = 2
+        assert json.loads(filepath.read_text()) == {"a": 1, "b": 2}
+        assert filepath.stat().st_ino != inode_before  # replaced, not rewritten
+        assert stat.S_IMODE(filepath.stat().st_mode) == 0o640
+        assert os.listdir(tmpdir) == ["state.json"]  # no temp file left behind
+
+        # A failing write leaves the previous content intact (and no temp file)
+        with mock.patch("os.replace", side_effect=OSError("disk full")):
+            try:
+                store["c"] = 3
+            except OSError:
+                pass
+        assert json.loads(filepath.read_text()) == {"a": 1, "b": 2}
+        assert os.listdir(tmpdir) == ["state.json"]
+
+        # Non-atomic mode writes in place
+        store = FileStore(filepath, atomic=False)
+        inode_before = filepath.stat().st_ino
+        store["d"] = 4
+        assert filepath.stat().st_ino == inode_before
+
+
+def test_file_store_key_path_reuses_parsed_document():
+    """Test that key_path flushes only re-read the file when it changed on disk."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = Path(tmpdir) / "config.json"
+        filepath.write_text('{"section1": {"a": 1}, "section2": {"b": 2}}')
+
+        n_loads = [0]
+
+        def counting_loader(content):
+            n_loads[0] += 1
+            return json.loads(content)
+
+        store = FileStore(
+            filepath, key_path="section1", loader=counting_loader, dumper=json.dumps
+        )
+        assert n_loads[0] == 1
+        for i in range(5):
+            store[f"k{i}"] = i
+        assert n_loads[0] == 1  # no re-parse on flush
+
+        # An external edit is picked up (and preserved) on the next flush
+        data = json.loads(filepath.read_text())
+        data["section2"]["from_outside"] = True
+        filepath.write_text(json.dumps(data, indent=4))
+        store["k5"] = 5
+        assert n_loads[0] == 2
+        data = json.loads(filepath.read_text())
+        assert data["section2"] == {"b": 2, "from_outside": True}
+        assert data["section1"]["k5"] == 5
+
+
+def test_file_store_auto_reload():
+    """Test that a FileStore with check_interval picks up external edits."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = Path(tmpdir) / "config.json"
+        filepath.write_text('{"a": 1}')
+
+        reloads = []
+        store = FileStore(filepath, check_interval=0, on_reload=reloads.append)
+        other = FileStore(filepath)  # e.g. another process
+
+        assert store["a"] == 1
+        assert store.refresh() is False  # nothing changed
+
+        other["a"] = 2
+        assert store["a"] == 2
+        assert reloads == [store]
+
+        # Unflushed local changes aren't discarded by a reload
+        with store:
+            store["b"] = 3
+            other["a"] = 4
+            assert store["a"] == 2
+            assert store["b"] == 3
+
+        # Without check_interval, the store doesn't look at the file
+        lazy = FileStore(filepath)
+        FileStore(filepath)["a"] = 5
+        assert lazy["a"] == 2
+        assert lazy.refresh() is True
+        assert lazy["a"] == 5
+
+
+def _locked_section_writer(filepath, section, n_writes):
+    store = FileStore(
+        filepath, key_path=section, create_key_path_content=dict, lock=True
+    )
+    for i in range(n_writes):
+        store[f"k{i}"] = i
+
+
+def test_file_store_lock_across_processes():
+    """Test that locked read-merge-write cycles don't lose concurrent sections."""
+    import multiprocessing
+    import sys
+
+    if sys.platform == "win32":
+        return  # fcntl locks are POSIX only
+    ctx = multiprocessing.get_context("fork")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = str(Path(tmpdir) / "state.json")
+        Path(filepath).write_text("{}")
+        workers = [
+            ctx.Process(target=_locked_section_writer, args=(filepath, f"w{i}", 20))
+            for i in range(4)
+        ]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        assert all(w.exitcode == 0 for w in workers)
+
+        data = json.loads(Path(filepath).read_text())
+        assert data == {f"w{i}": {f"k{j}": j for j in range(20)} for i in range(4)}
+
+
+def test_file_store_lock_timeout_and_stats():
+    """Test lock timeouts, and that lock waits are exposed in stats."""
+    import fcntl
+    import os
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = Path(tmpdir) / "state.json"
+        filepath.write_text("{}")
+        store = FileStore(filepath, lock=True, lock_timeout=0.1)
+        assert store.stats["lock_acquisitions"] == 1  # the initial load
+
+        # Someone else holds an exclusive lock
+        fd = os.open(str(filepath) + ".lock", os.O_RDWR)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            try:
+                store["a"] = 1
+                raise AssertionError("Should have timed out")
+            except TimeoutError:
+                pass
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+        store.flush()  # the pending change is written once the lock is free
+        assert json.loads(filepath.read_text()) == {"a": 1}
+        assert store.stats["lock_acquisitions"] == 2
+        assert store.stats["lock_wait_seconds"] > 0
+
+
+def test_file_store_three_way_merge():
+    """Test that merge=True applies only our changes onto a changed file."""
+    from config2py.sync_store import MergeConflict, DELETED
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = Path(tmpdir) / "state.json"
+        filepath.write_text('{"section": {"a": 1, "b": 2, "c": 3}, "other": {}}')
+
+        ours = FileStore(filepath, key_path="section", merge=True)
+        theirs = FileStore(filepath, key_path="section")
+
+        theirs["b"] = 20  # another writer changes b and deletes c
+        del theirs["c"]
+        ours["a"] = 10  # we only touch a, with a stale view of b and c
+        data = json.loads(filepath.read_text())
+        assert data["section"] == {"a": 10, "b": 20}
+        assert dict(ours) == {"a": 10, "b": 20}  # ours now sees their changes
+
+        # Conflicts: both changed the same key. By default, ours wins
+        theirs.reload()
+        theirs["a"] = "theirs"
+        ours["a"] = "ours"
+        assert json.loads(filepath.read_text())["section"]["a"] == "ours"
+
+        # ... but conflicts can also raise
+        ours.on_conflict = "raise"
+        theirs.reload()
+        theirs["b"] = "theirs"
+        try:
+            ours["b"] = "ours"
+            raise AssertionError("Should have raised MergeConflict")
+        except MergeConflict as e:
+            assert (e.key, e.base, e.ours, e.theirs) == ("b", 20, "ours", "theirs")
+        ours.on_conflict = "theirs"  # the failed flush is retried on the next one
+        ours.flush()
+        assert json.loads(filepath.read_text())["section"]["b"] == "theirs"
+
+        # ... or be resolved by a function
+        conflicts = []
+
+        def resolve(key, base, ours_value, theirs_value):
+            conflicts.append((key, base, ours_value, theirs_value))
+            return DELETED
+
+        ours = FileStore(filepath, key_path="section", merge=True, on_conflict=resolve)
+        theirs.reload()
+        theirs["a"] = 1
+        ours["a"] = 2
+        assert conflicts == [("a", "ours", 2, 1)]
+        assert "a" not in json.loads(filepath.read_text())["section"]
+
+
+def test_sync_store_patch_dumper():
+    """Test that a patch_dumper only receives the keys changed since the last flush."""
+    full_dumps = []
+    patches = []
+
+    store = SyncStore(
+        lambda: {"a": 1, "b": 2, "c": 3},
+        full_dumps.append,
+        patch_dumper=lambda updated, deleted: patches.append((updated, deleted)),
+    )
+    store["a"] = 10
+    assert patches == [({"a": 10}, set())]
+
+    with store:
+        store["d"] = 4
+        del store["b"]
+        store["b"] = 20  # deleted, then set again: an update
+        del store["c"]
+        store["e"] = 5
+        del store["e"]  # set, then deleted: a deletion (of a possibly absent key)
+        assert store.pending_changes() == ({"d": 4, "b": 20}, {"c", "e"})
+    assert patches[-1] == ({"d": 4, "b": 20}, {"c", "e"})
+
+    store.clear()
+    assert patches[-1] == ({}, {"a", "b", "d"})
+    assert store.pending_changes() == ({}, set())
+    assert full_dumps == []  # never needed a full rewrite
+
+
+def test_journal_store():
+    """Test JournalStore appends changes, replays them and compacts."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "store.json"
+        journal = Path(tmpdir) / "store.json.journal"
+
+        store = JournalStore(path, compact_min_size=10**6)
+        assert dict(store) == {}
+        store["a"] = 1
+        with store:
+            store["b"] = [1, 2]
+            store["c"] = "x"
+            del store["a"]
+        assert not path.exists()  # nothing but appends so far
+        assert len(journal.read_text().splitlines()) == 2
+        assert dict(JournalStore(path)) == {"b": [1, 2], "c": "x"}
+
+        # A torn last record is dropped (and removed), earlier ones are kept
+        with open(journal, "a") as f:
+            f.write('{"set":{"d":')
+        reopened = JournalStore(path)
+        assert dict(reopened) == {"b": [1, 2], "c": "x"}
+        reopened["e"] = 5
+        assert dict(JournalStore(path)) == {"b": [1, 2], "c": "x", "e": 5}
+
+        # Explicit compaction folds the journal into the snapshot
+        reopened.compact()
+        assert journal.stat().st_size == 0
+        assert json.loads(path.read_text()) == {"b": [1, 2], "c": "x", "e": 5}
+        assert dict(JournalStore(path)) == {"b": [1, 2], "c": "x", "e": 5}
+
+        # A malformed record that isn't the last one is an error
+        with open(journal, "w") as f:
+            f.write('{"set":\n{"set":{"z":1}}\n')
+        try:
+            JournalStore(path)
+            assert False, "Should have raised ValueError"
+        except ValueError as e:
+            assert "line 1" in str(e)
+
+
+def test_journal_store_auto_compaction():
+    """Test that the journal is compacted once it outgrows the thresholds."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "store.json"
+        store = JournalStore(path, compact_min_size=200, compact_ratio=2.0)
+        for i in range(100):
+            store[f"key_{i % 10}"] = i
+        assert store.stats["journal_appends"] == 100
+        assert store.stats["compactions"] >= 1
+        assert (
+            Path(tmpdir) / "store.json.journal"
+        ).stat().st_size < 200 + 20  # never far past limit
+        expected = {f"key_{i}": 90 + i for i in range(10)}
+        assert dict(store) == expected
+        assert dict(JournalStore(path)) == expected
+
+
+def test_journal_store_durability():
+    """Test that 'flush' and 'fsync' durabilities fsync appends, as for FileStore."""
+    import os
+    from unittest import mock
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for durability, min_fsyncs in [("none", 0), ("flush", 2), ("fsync", 2)]:
+            filepath = Path(tmpdir) / f"{durability}.json"
+            store = JournalStore(filepath, durability=durability)
+            with mock.patch("os.fsync", wraps=os.fsync) as fsync:
+                store["a"] = 1
+                store["b"] = 2
+            if min_fsyncs:
+                assert fsync.call_count >= min_fsyncs
+            else:
+                assert fsync.call_count == 0
+
+            # Compacting makes the snapshot's rename durable before emptying the
+            # journal
+            calls = []
+            with (
+                mock.patch(
+                    "config2py.sync_store._fsync_dir",
+                    side_effect=lambda d: calls.append("fsync_dir"),
+                ),
+                mock.patch(
+                    "os.truncate", side_effect=lambda *a: calls.append("truncate")
+                ),
+            ):
+                store.compact()
+            if durability == "none":
+                assert calls == ["truncate"]
+            else:
+                assert calls[-2:] == ["fsync_dir", "truncate"]
+
+        # Typos are reported by the constructors, before anything is read or written
+        filepath = Path(tmpdir) / "typo.json"
+        for make_store in [
+            lambda: FileStore(filepath, durability="fsynk", create_file_content=dict),
+            lambda: JournalStore(filepath, durability="fsynk"),
+        ]:
+            try:
+                make_store()
+                assert False, "Should have raised ValueError"
+            except ValueError:
+                pass
+            assert not filepath.exists()
+
+
+def test_file_store_mmap_reads():
+    """Test that large files are parsed from a memory map, with the same result."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = Path(tmpdir) / "big.json"
+        data = {f"key_{i}": {"value": i, "name": f"caf\u00e9 {i}"} for i in range(500)}
+        filepath.write_text(json.dumps({"section": data}), encoding="utf-8")
+
+        store = JsonStore(filepath, key_path="section", mmap_threshold=1024)
+        assert store.stats["mmap_reads"] == 1
+        assert dict(store) == data
+        store["new"] = 1
+        assert FileStore(filepath, key_path="section")["new"] == 1
+
+        # Small files, or no threshold, or a custom loader: regular reads
+        assert FileStore(filepath, mmap_threshold=10**9).stats["mmap_reads"] == 0
+        assert FileStore(filepath).stats["mmap_reads"] == 0
+        custom = FileStore(filepath, loader=lambda s: json.loads(s), mmap_threshold=0)
+        assert custom.stats["mmap_reads"] == 0
+
+        # Empty files can't be mapped
+        empty = Path(tmpdir) / "empty.json"
+        empty.write_text("")
+        try:
+            FileStore(empty, mmap_threshold=0)
+            assert False, "Should have raised a JSON decoding error"
+        except ValueError as e:
+            assert "mmap" not in str(e)
+
+
+def test_sync_store_nested_batches():
+    """Test that nested with blocks only flush when the outermost one exits."""
+    dumps = []
+    store = SyncStore(lambda: {}, lambda d: dumps.append(dict(d)))
+
+    def set_many(store, **kwargs):
+        with store:  # Batches its own changes, and joins its caller's batch
+            for k, v in kwargs.items():
+                store[k] = v
+
+    with store:
+        set_many(store, a=1, b=2)
+        with store:
+            store["c"] = 3
+        assert dumps == []
+        store["d"] = 4
+        assert dumps == []
+    assert dumps == [{"a": 1, "b": 2, "c": 3, "d": 4}]
+
+    set_many(store, e=5, f=6)
+    assert len(dumps) == 2
+
+    try:
+        SyncStore(dict, print, batch_scope="process")
+        assert False, "Should have raised ValueError"
+    except ValueError:
+        pass
+
+
+def test_sync_store_threads():
+    """Test concurrent mutations, iteration and per-thread batches."""
+    import threading
+
+    dumps = []
+    store = SyncStore(lambda: {}, lambda d: dumps.append(len(d)))
+
+    def writer(i):
+        for j in range(200):
+            store[f"{i}_{j}"] = j
+            if j % 2:
+                del store[f"{i}_{j}"]
+
+    def reader():
+        for _ in range(200):
+            for _ in store:  # Never "dictionary changed size during iteration"
+                pass
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(4)]
+    threads += [threading.Thread(target=reader) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(store) == 4 * 100
+    assert dumps[-1] == 4 * 100
+
+    # With batch_scope='thread', other threads wait for the batch to complete
+    dumps = []
+    store = SyncStore(lambda: {}, lambda d: dumps.append(dict(d)), batch_scope="thread")
+    in_batch = threading.Event()
+
+    def other_thread():
+        in_batch.wait()
+        store["other"] = 1  # Blocks until the batch below is flushed
+
+    t = threading.Thread(target=other_thread)
+    t.start()
+    with store:
+        store["a"] = 1
+        in_batch.set()
+        t.join(0.1)
+        assert t.is_alive()
+        store["b"] = 2
+    t.join()
+    assert dumps == [{"a": 1, "b": 2}, {"a": 1, "b": 2, "other": 1}]
+
+    # ... and so do their reads
+    seen = []
+    reader = threading.Thread(target=lambda: seen.append(store.get("c")))
+    with store:
+        store["c"] = 3
+        reader.start()
+        reader.join(0.1)
+        assert reader.is_alive()
+        store["c"] = 4
+    reader.join()
+    assert seen == [4]
+
+
+def test_sync_store_snapshots():
+    """Test that snapshots are immutable views of the last committed state."""
+    store = SyncStore(lambda: {"a": {"x": 1}}, lambda d: None, snapshots=True)
+    first = store.snapshot()
+    assert store.snapshot() is first  # Nothing copied until the next commit
+    assert first == {"a": {"x": 1}}
+    try:
+        first["b"] = 2
+        assert False, "Should have raised TypeError"
+    except TypeError:
+        pass
+
+    with store:
+        store["b"] = 2
+        del store["a"]
+        assert store.snapshot() is first
+    second = store.snapshot()
+    assert second == {"b": 2}
+    assert first == {"a": {"x": 1}}  # Unaffected by later commits
+
+    store.clear()
+    assert store.snapshot() == {} and second == {"b": 2}
+
+    try:
+        SyncStore(dict, print).snapshot()
+        assert False, "Should have raised RuntimeError"
+    except RuntimeError:
+        pass
+
+    # Nested (key_sep) changes don't show in the snapshot before they're committed
+    store = SyncStore(
+        lambda: {"db": {"host": "a", "opts": {"x": 1}}},
+        lambda d: None,
+        snapshots=True,
+        key_sep=".",
+    )
+    snapshot = store.snapshot()
+    with store:
+        store["db.port"] = 1
+        store["db.opts.y"] = 2
+        del store["db.opts.x"]
+        assert snapshot == {"db": {"host": "a", "opts": {"x": 1}}}
+    assert store.snapshot() == {"db": {"host": "a", "port": 1, "opts": {"y": 2}}}
+    assert snapshot == {"db": {"host": "a", "opts": {"x": 1}}}
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = Path(tmpdir) / "config.json"
+        filepath.write_text('{"a": 1}')
+        store = FileStore(filepath, snapshots=True)
+        snapshot = store.snapshot()
+        store["b"] = 2
+        assert snapshot == {"a": 1} and store.snapshot() == {"a": 1, "b": 2}
+
+
+def test_sync_store_lazy_loading():
+    """Test that lazy stores load on first use, and clear() without loading."""
+    loads = []
+    dumps = []
+
+    def loader():
+        loads.append(1)
+        return {"a": 1}
+
+    store = SyncStore(loader, lambda d: dumps.append(dict(d)), lazy=True)
+    assert loads == [] and "not loaded" in repr(store)
+    assert len(store) == 1
+    assert store["a"] == 1 and loads == [1]
+
+    store = SyncStore(loader, lambda d: dumps.append(dict(d)), lazy=True)
+    store["b"] = 2  # Mutations need the data too
+    assert loads == [1, 1] and dumps[-1] == {"a": 1, "b": 2}
+
+    store = SyncStore(loader, lambda d: dumps.append(dict(d)), lazy=True)
+    store.clear()
+    assert loads == [1, 1] and dumps[-1] == {}
+    assert dict(store) == {}
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = Path(tmpdir) / "config.json"
+        filepath.write_text("not json, and never parsed")
+        store = FileStore(filepath, lazy=True, check_interval=0)
+        store.clear()
+        assert json.loads(filepath.read_text()) == {}
+
+        filepath.write_text('{"s": {"a": 1}, "t": {"b": 2}}')
+        store = FileStore(filepath, key_path="s", lazy=True)
+        store.clear()  # Other sections are kept
+        assert json.loads(filepath.read_text()) == {"s": {}, "t": {"b": 2}}
+
+
+def test_file_store_shared_document():
+    """Test that views of one file made with share=True share its document."""
+    import os
+
+    parses = []
+    writes = []
+
+    def loader(content):
+        parses.append(1)
+        return json.loads(content)
+
+    def dumper(data, **kwargs):
+        writes.append(1)
+        return json.dumps(data)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = Path(tmpdir) / "config.json"
+        filepath.write_text('{"servers": {"a": 1}, "users": {"bob": 2}}')
+        kwargs = dict(loader=loader, dumper=dumper, share=True, check_interval=0)
+        reloaded = []
+        servers = FileStore(
+            filepath, key_path="servers", on_reload=reloaded.append, **kwargs
+        )
+        users = FileStore(
+            str(filepath), key_path="users", on_reload=reloaded.append, **kwargs
+        )
+        everything = FileStore(filepath, **kwargs)
+        assert len(parses) == 1  # Parsed once for all views
+        assert everything["users"] is users._data
+
+        # A batch on one view batches them all, and they're written at once
+        with servers:
+            servers["b"] = 2
+            users["alice"] = 3
+            assert writes == []
+        assert len(writes) == 1
+        assert json.loads(filepath.read_text()) == {
+            "servers": {"a": 1, "b": 2},
+            "users": {"bob": 2, "alice": 3},
+        }
+        assert not users._needs_flush
+
+        users["carol"] = 4  # Writes the document (seen through the other views)
+        assert len(writes) == 2 and everything["users"]["carol"] == 4
+
+        # External changes are detected and reloaded once, for all the views
+        filepath.write_text('{"servers": {"z": 0}, "users": {}}')
+        os.utime(filepath, ns=(1, 1))
+        n_parses = len(parses)
+        assert dict(servers) == {"z": 0}
+        assert dict(users) == {} and everything == {"servers": {"z": 0}, "users": {}}
+        assert len(parses) == n_parses + 1
+        assert reloaded == [servers, users]
+
+        # Reloading a view can't discard the pending changes of the others
+        with users:
+            users["new"] = 1
+            try:
+                servers.reload()
+                assert False, "Should have raised RuntimeError"
+            except RuntimeError:
+                pass
+            assert not servers.refresh()
+            # A view created (with its key path) in the batch doesn't write it
+            n_writes = len(writes)
+            extra = FileStore(
+                filepath,
+                key_path="extra",
+                create_key_path_content=dict,
+                **kwargs,
+            )
+            assert len(writes) == n_writes
+        assert users["new"] == 1 and extra == {}
+        assert json.loads(filepath.read_text()) == {
+            "servers": {"z": 0},
+            "users": {"new": 1},
+            "extra": {},
+        }
+        servers.reload()  # Nothing pending anymore
+
+        # Views of other files, or without share=True, have their own document
+        assert FileStore(filepath, loader=loader, dumper=dumper)._doc is not (
+            servers._doc
+        )
+        for bad_kwargs in [dict(merge=True), dict(dump_kwargs={"indent": 2})]:
+            try:
+                FileStore(filepath, **dict(kwargs, **bad_kwargs))
+                assert False, "Should have raised ValueError"
+            except ValueError:
+                pass
+
+
+def test_sync_store_key_sep():
+    """Test nested item access with key_sep."""
+    patches = []
+    store = SyncStore(
+        lambda: {"db": {"host": "a", "opts": {"ssl": True}}, "x.y": 1},
+        lambda d: None,
+        patch_dumper=lambda updated, deleted: patches.append((updated, deleted)),
+        key_sep=".",
+    )
+    db = store["db"]
+    assert store["db.opts.ssl"] is True
+    assert "db.host" in store and "db.port" not in store
+    try:
+        store["db.host.nope"]
+        assert False, "Should have raised KeyError"
+    except KeyError:
+        pass
+
+    store["db.opts.timeout"] = 3
+    assert store["db"] is db  # Updated in place
+    assert db["opts"] == {"ssl": True, "timeout": 3}
+    assert patches[-1] == ({"db": db}, set())
+
+    store["new.deep.key"] = 1
+    assert store["new"] == {"deep": {"key": 1}}
+    del store["db.opts"]
+    assert db == {"host": "a"}
+    assert store.pop("db.host") == "a" and store.pop("db.host", None) is None
+    assert store.setdefault("db.port", 5432) == 5432
+    try:
+        del store["db.nope"]
+        assert False, "Should have raised KeyError"
+    except KeyError:
+        pass
+    assert sorted(store) == ["db", "new", "x.y"]
+
+    # Top-level keys containing the separator are taken literally
+    assert "x.y" in store and store["x.y"] == 1
+    assert dict(store)["x.y"] == 1
+    store["x.y"] = 2
+    assert store["x.y"] == 2 and "x" not in store
+    saved = []
+    store = SyncStore(
+        lambda: {"x.y": 1, "z": 2}, lambda d: saved.append(dict(d)), key_sep="."
+    )
+    assert store.popitem() == ("x.y", 1)
+    assert saved[-1] == {"z": 2}
+    store["x.y"] = 1
+    store.clear()
+    assert dict(store) == {} and saved[-1] == {} and not store._needs_flush
+
+    # Without key_sep, keys are just keys
+    plain = SyncStore(lambda: {}, lambda d: None)
+    plain["a.b"] = 1
+    assert dict(plain) == {"a.b": 1}
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = Path(tmpdir) / "config.json"
+        filepath.write_text('{"app": {"settings": {"theme": "dark"}}}')
+        store = FileStore(filepath, key_path="app", key_sep="/")
+        store["settings/font/size"] = 12
+        assert json.loads(filepath.read_text()) == {
+            "app": {"settings": {"theme": "dark", "font": {"size": 12}}}
+        }
+
+
+def test_json_path_loader():
+    """Test the partial JSON parser against json.loads, on random documents."""
+    import random
+    from config2py.sync_store import _json_path_loader
+
+    rnd = random.Random(0)
+    keys = ["a", "b", 'q"uote', "sl\\ash", "\u00e9", "br[ack}et"]
+
+    def random_value(depth):
+        kind = rnd.randrange(7 if depth < 4 else 4)
+        if kind == 0:
+            return rnd.choice([True, False, None])
+        if kind == 1:
+            return rnd.choice([0, -1.5e3, 42])
+        if kind == 2:
+            return rnd.choice(["", "]}", '"{', "x\ny"])
+        if kind == 3:
+            return []
+        if kind == 4:
+            return [random_value(depth + 1) for _ in range(rnd.randrange(4))]
+        return {rnd.choice(keys): random_value(depth + 1) for _ in range(4)}
+
+    for _ in range(300):
+        doc = {k: random_value(0) for k in keys}
+        text = json.dumps(doc, indent=rnd.choice([None, 2]))
+        path = tuple(rnd.choice(keys) for _ in range(rnd.randrange(1, 4)))
+        try:
+            expected = reduce(lambda d, k: d[k], path, doc)
+        except (KeyError, TypeError):
+            try:
+                _json_path_loader(text, path)
+                assert False, f"Should have raised KeyError for {path}"
+            except KeyError:
+                pass
+        else:
+            assert _json_path_loader(text, path) == expected
+
+    # Scanning stops at the key: what follows isn't looked at (so, with duplicate
+    # keys, the first one wins)
+    assert _json_path_loader('{"a": {"b": 2}, "z": [unbalanced', ("a", "b")) == 2
+    assert _json_path_loader('{"a": {"b": 2}, "a": 1}', ("a", "b")) == 2
+
+
+def test_file_store_partial_load():
+    """Test that partial_load stores parse only their section."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = Path(tmpdir) / "config.json"
+        doc = {"big": list(range(1000)), "app": {"servers": {"a": 1}}, "z": 0}
+        filepath.write_text(json.dumps(doc))
+
+        store = JsonStore(filepath, key_path="app.servers", partial_load=True)
+        assert store.stats["partial_loads"] == 1
+        assert dict(store) == {"a": 1}
+        store["b"] = 2  # Writing parses the whole file, keeping other sections
+        doc["app"]["servers"]["b"] = 2
+        assert json.loads(filepath.read_text()) == doc
+
+        # Missing key paths are reported (or created) as without partial_load
+        try:
+            FileStore(filepath, key_path="app.nope", partial_load=True)
+            assert False, "Should have raised KeyError"
+        except KeyError as e:
+            assert "Key path not found" in str(e)
+        store = FileStore(
+            filepath,
+            key_path="app.new",
+            partial_load=True,
+            create_key_path_content=dict,
+        )
+        assert store.stats["partial_loads"] == 0
+        assert json.loads(filepath.read_text())["app"]["new"] == {}
+
+
+def test_file_store_skips_unchanged_writes():
+    """Test that flushes writing what the file already contains are skipped."""
+    import os
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = Path(tmpdir) / "config.json"
+        filepath.write_text(json.dumps({"a": 1, "b": [1, 2]}, indent=2))
+        os.utime(filepath, ns=(1, 1))
+
+        store = JsonStore(filepath)
+        store["a"] = 1  # Same value: same content
+        with store:
+            store["c"] = 3
+            del store["c"]
+        assert store.stats["skipped_writes"] == 2
+        assert filepath.stat().st_mtime_ns == 1  # Never touched
+
+        store["a"] = 2
+        assert json.loads(filepath.read_text())["a"] == 2
+        store["a"] = 2
+        assert store.stats["skipped_writes"] == 3
+
+        # If the file changed on disk, it's written even if our content is the same
+        content = filepath.read_text()
+        filepath.write_text("{}")
+        store["a"] = 2
+        assert filepath.read_text() == content
+        assert store.stats["skipped_writes"] == 3
+
+        store = JsonStore(filepath, skip_unchanged=False)
+        os.utime(filepath, ns=(1, 1))
+        store["a"] = 2
+        assert store.stats["skipped_writes"] == 0
+        assert filepath.stat().st_mtime_ns != 1
+
+
+def test_file_store_compressed_files():
+    """Test that .gz, .bz2 and .xz files are transparently (de)compressed."""
+    import bz2
+    import gzip
+    import lzma
+
+    decompress = {
+        ".gz": gzip.decompress,
+        ".bz2": bz2.decompress,
+        ".xz": lzma.decompress,
+    }
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for suffix, decompressor in decompress.items():
+            filepath = Path(tmpdir) / f"config.json{suffix}"
+            store = JsonStore(filepath, create_file_content=dict)
+            store["a"] = {"b": 1}
+            assert json.loads(decompressor(filepath.read_bytes())) == {"a": {"b": 1}}
+            assert dict(FileStore(filepath)) == {"a": {"b": 1}}
+
+            section = FileStore(filepath, key_path="a")
+            section["c"] = 2
+            assert dict(FileStore(filepath)) == {"a": {"b": 1, "c": 2}}
+
+            # Unchanged content is still detected (on the uncompressed content)
+            section["c"] = 2
+            assert section.stats["skipped_writes"] == 1
+
+        # The compression level can be chosen
+        data = {f"key_{i}": "value " * (i % 7) for i in range(500)}
+        sizes = {}
+        for level in (1, 9):
+            filepath = Path(tmpdir) / f"level_{level}.json.gz"
+            store = JsonStore(
+                filepath, create_file_content=dict, compression_level=level
+            )
+            store.update(data)
+            assert json.loads(gzip.decompress(filepath.read_bytes())) == data
+            sizes[level] = filepath.stat().st_size
+        assert sizes[9] <= sizes[1]
+
+
+def test_file_store_parse_cache():
+    """Test that a parse cache spares parsing files that didn't change."""
+    from config2py.parse_cache import ParseCache
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = Path(tmpdir) / "config.json"
+        filepath.write_text(json.dumps({"a": {"b": 1}}, indent=2))
+        cache = ParseCache(Path(tmpdir) / "cache")
+
+        store = JsonStore(filepath, parse_cache=cache)
+        assert dict(store) == {"a": {"b": 1}}
+        assert store.stats["parse_cache_hits"] == 0
+
+        store = JsonStore(filepath, key_path="a", parse_cache=cache)
+        assert dict(store) == {"b": 1}
+        assert store.stats["parse_cache_hits"] == 1
+
+        # Writes (including skipped ones) still know what the file contains
+        store["b"] = 1
+        assert store.stats["skipped_writes"] == 1
+        store["b"] = 2
+        assert json.loads(filepath.read_text()) == {"a": {"b": 2}}
+
+        store = JsonStore(filepath, parse_cache=cache)
+        assert dict(store) == {"a": {"b": 2}}
+        assert store.stats["parse_cache_hits"] == 0  # The file changed
+
+
 if __name__ == "__main__":
     if PYTEST_AVAILABLE:
         pytest.main([__file__, "-v"])
@@ -297,6 +1358,33 @@ if __name__ == "__main__":
             test_file_store_batch_operations,
             test_extension_registry,
             test_store_repr,
+            test_version_tokens,
+            test_sync_store_bulk_operations_flush_once,
+            test_sync_store_write_behind,
+            test_sync_store_failed_background_flush_is_retried,
+            test_json_store_passes_store_options,
+            test_file_store_atomic_writes,
+            test_file_store_key_path_reuses_parsed_document,
+            test_file_store_auto_reload,
+            test_file_store_lock_across_processes,
+            test_file_store_lock_timeout_and_stats,
+            test_file_store_three_way_merge,
+            test_sync_store_patch_dumper,
+            test_journal_store,
+            test_journal_store_auto_compaction,
+            test_journal_store_durability,
+            test_file_store_mmap_reads,
+            test_sync_store_nested_batches,
+            test_sync_store_threads,
+            test_sync_store_snapshots,
+            test_sync_store_lazy_loading,
+            test_file_store_shared_document,
+            test_sync_store_key_sep,
+            test_json_path_loader,
+            test_file_store_partial_load,
+            test_file_store_skips_unchanged_writes,
+            test_file_store_compressed_files,
+            test_file_store_parse_cache,
         ]
 
         failed = []
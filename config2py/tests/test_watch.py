@@ -0,0 +1,99 @@
+"""Tests for the watch module."""
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from config2py.watch import FileWatcher, inotify_available
+from config2py.sync_store import FileStore
+from config2py.s_configparser import ConfigStore
+
+backends = [
+    pytest.param(
+        True,
+        id="inotify",
+        marks=pytest.mark.skipif(
+            not inotify_available(), reason="inotify not available"
+        ),
+    ),
+    pytest.param(False, id="polling"),
+]
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture(params=backends)
+def watcher(request):
+    watcher = FileWatcher(use_inotify=request.param, poll_interval=0.02)
+    yield watcher
+    watcher.stop()
+
+
+def test_watch_file_debounced(watcher):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.realpath(os.path.join(tmpdir, "config.json"))
+        Path(filepath).write_text("{}")
+        calls = []
+        handle = watcher.watch(filepath, calls.append)
+
+        for i in range(5):  # a burst of writes...
+            Path(filepath).write_text(json.dumps({"i": i}))
+        assert wait_for(lambda: calls)
+        time.sleep(0.2)
+        assert calls == [filepath]  # ... gives a single call
+
+        # Other files of the folder don't trigger the callback
+        Path(tmpdir, "other.json").write_text("{}")
+        time.sleep(0.2)
+        assert calls == [filepath]
+
+        handle.cancel()
+        Path(filepath).write_text('{"after": "cancel"}')
+        time.sleep(0.2)
+        assert calls == [filepath]
+
+
+def test_watch_folder(watcher):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = os.path.realpath(tmpdir)
+        calls = []
+        watcher.watch(tmpdir, calls.append)
+        Path(tmpdir, "new_config.txt").write_text("value")
+        assert wait_for(lambda: calls == [tmpdir])
+
+
+def test_file_store_watch():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = Path(tmpdir) / "config.json"
+        filepath.write_text('{"a": 1}')
+        reloads = []
+        store = FileStore(filepath, watch=True, on_reload=reloads.append)
+        FileStore(filepath)["a"] = 2  # e.g. another process
+        assert wait_for(lambda: reloads)
+        assert store["a"] == 2
+
+        store["a"] = 3  # our own writes don't trigger a reload
+        time.sleep(0.2)
+        assert reloads == [store]
+
+
+def test_config_store_watch():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "config.ini")
+        Path(filepath).write_text("[section]\nkey = 1\n")
+        store = ConfigStore(filepath)
+        reloads = []
+        handle = store.watch(reloads.append)
+        Path(filepath).write_text("[section]\nkey = 2\n")
+        assert wait_for(lambda: reloads)
+        assert store["section"]["key"] == "2"
+        handle.cancel()
@@ -60,6 +60,15 @@ class EnvironmentVariables(ChainMap):
     def __init__(self):
         super().__init__(os.environ)
 
+    def version(self):
+        """Return a token that changes when the environment is mutated.
+
+        The token is a hash of all the variables (names and values), so changes
+        made directly on ``os.environ`` are detected too (barring a hash
+        collision), and the values themselves aren't exposed.
+        """
+        return hash(frozenset(os.environ.items()))
+
     def __repr__(self):
         return "EnvironmentVariables"
 
@@ -0,0 +1,412 @@
+"""
+Watch local config files and folders for changes.
+
+A single background thread serves all the watches of a process. On Linux, it uses
+inotify (through ``ctypes``, no third-party dependency); elsewhere (or if inotify
+isn't usable) it falls back to polling the watched paths' stat signatures.
+
+Callbacks are debounced: a burst of events on a path (e.g. an editor saving a file,
+or a write-then-rename) results in a single call, ``debounce`` seconds after the
+last event. They're called, on the watcher thread, with the watched path.
+
+Files are watched through their parent folder, so that files that are replaced
+(as ``FileStore`` does with its atomic writes, and many editors do) keep being
+watched. Watching a folder reports changes to any file directly in it.
+
+>>> import tempfile, time
+>>> changed = []
+>>> with tempfile.TemporaryDirectory() as tmpdir:
+...     filepath = os.path.join(tmpdir, 'config.json')
+...     with open(filepath, 'w') as f:
+...         _ = f.write('{}')
+...     handle = watch_path(filepath, changed.append)
+...     with open(filepath, 'w') as f:
+...         _ = f.write('{"a": 1}')
+...     deadline = time.monotonic() + 5
+...     while not changed and time.monotonic() < deadline:
+...         time.sleep(0.01)
+...     handle.cancel()
+>>> changed == [os.path.realpath(filepath)]
+True
+
+``FileStore(..., watch=True)`` and ``ConfigStore.watch()`` use this to reload when
+their file changes. For folder-based config stores (like the ``TextFiles`` returned
+by ``get_configs_local_store``), use ``watch_path(store.rootdir, callback)``.
+"""
+
+import os
+import select
+import struct
+import sys
+import threading
+import time
+import warnings
+from typing import Callable, Dict, List, Optional, Union
+from pathlib import Path
+
+from config2py.sync_store import file_signature
+
+__all__ = ["FileWatcher", "Watch", "get_watcher", "watch_path", "inotify_available"]
+
+PathT = Union[str, Path]
+WatchCallback = Callable[[str], None]
+
+DFLT_DEBOUNCE = 0.05
+DFLT_POLL_INTERVAL = 1.0
+
+
+# --------------------------------------------------------------------------------------
+# inotify (Linux), through ctypes
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+)
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+_libc = None
+
+
+def _get_libc():
+    global _libc
+    if _libc is None:
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [
+            ctypes.c_int,
+            ctypes.c_char_p,
+            ctypes.c_uint32,
+        ]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        _libc = libc
+    return _libc
+
+
+def inotify_available() -> bool:
+    """Whether inotify can be used on this system."""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        return hasattr(_get_libc(), "inotify_init1")
+    except OSError:
+        return False
+
+
+def _oserror_from_errno(msg):
+    import ctypes
+
+    errno = ctypes.get_errno()
+    return OSError(errno, f"{msg}: {os.strerror(errno)}")
+
+
+class _InotifyBackend:
+    """Translates inotify events on folders into changes of watched paths."""
+
+    def __init__(self):
+        self._libc = _get_libc()
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise _oserror_from_errno("inotify_init1 failed")
+        self._wd_of_dir: Dict[str, int] = {}
+        self._dir_of_wd: Dict[int, str] = {}
+        # folder -> {name: watched path} (name None for the folder itself)
+        self._targets: Dict[str, Dict[Optional[str], str]] = {}
+        self._location: Dict[str, tuple] = {}  # watched path -> (folder, name)
+
+    def fileno(self):
+        return self._fd
+
+    def add(self, path: str):
+        dirpath, name = (path, None) if os.path.isdir(path) else os.path.split(path)
+        if dirpath not in self._wd_of_dir:
+            wd = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(dirpath), _WATCH_MASK
+            )
+            if wd < 0:
+                raise _oserror_from_errno(f"Can't watch {dirpath}")
+            self._wd_of_dir[dirpath] = wd
+            self._dir_of_wd[wd] = dirpath
+        self._targets.setdefault(dirpath, {})[name] = path
+        self._location[path] = (dirpath, name)
+
+    def remove(self, path: str):
+        dirpath, name = self._location.pop(path)
+        targets = self._targets.get(dirpath, {})
+        targets.pop(name, None)
+        if not targets and dirpath in self._wd_of_dir:
+            del self._targets[dirpath]
+            wd = self._wd_of_dir.pop(dirpath)
+            del self._dir_of_wd[wd]
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def read_changes(self) -> set:
+        """Read pending events, returning the watched paths they concern."""
+        changed = set()
+        while True:
+            try:
+                buf = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(buf):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(buf, offset)
+                offset += _EVENT_HEADER.size
+                name = buf[offset : offset + length].rstrip(b"\0")
+                offset += length
+                if mask & _IN_Q_OVERFLOW:  # events were lost: report everything
+                    for targets in self._targets.values():
+                        changed.update(targets.values())
+                    continue
+                dirpath = self._dir_of_wd.get(wd)
+                if dirpath is None or mask & _IN_IGNORED:
+                    continue
+                targets = self._targets.get(dirpath, {})
+                if None in targets:
+                    changed.add(targets[None])
+                path = targets.get(os.fsdecode(name))
+                if path is not None:
+                    changed.add(path)
+
+    def poll_changes(self) -> set:
+        return set()
+
+    def close(self):
+        os.close(self._fd)
+
+
+# --------------------------------------------------------------------------------------
+# Polling fallback
+
+
+def _path_state(path: str):
+    """A cheap token of a file's (or a folder's files') state."""
+    if not os.path.isdir(path):
+        return file_signature(path)
+    try:
+        entries = frozenset(
+            (entry.name, st.st_mtime_ns, st.st_size, st.st_ino)
+            for entry in os.scandir(path)
+            for st in (entry.stat(),)
+        )
+    except FileNotFoundError:
+        return None
+    return file_signature(path), entries
+
+
+class _PollingBackend:
+    """Detects changes of watched paths by comparing their stat signatures."""
+
+    def __init__(self):
+        self._states: Dict[str, object] = {}
+
+    def fileno(self):
+        return None
+
+    def add(self, path: str):
+        self._states[path] = _path_state(path)
+
+    def remove(self, path: str):
+        self._states.pop(path, None)
+
+    def read_changes(self) -> set:
+        return set()
+
+    def poll_changes(self) -> set:
+        changed = set()
+        for path, state in list(self._states.items()):
+            new_state = _path_state(path)
+            if new_state != state:
+                self._states[path] = new_state
+                changed.add(path)
+        return changed
+
+    def close(self):
+        pass
+
+
+# --------------------------------------------------------------------------------------
+# Watcher
+
+
+class Watch:
+    """Handle on a registered watch. Call ``cancel()`` to stop watching."""
+
+    def __init__(self, watcher: "FileWatcher", path: str, callback: WatchCallback):
+        self.watcher = watcher
+        self.path = path
+        self.callback = callback
+
+    def cancel(self):
+        self.watcher.unwatch(self)
+
+    def _fire(self):
+        try:
+            self.callback(self.path)
+        except Exception as e:
+            warnings.warn(f"Watch callback for {self.path} failed: {e!r}")
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.path!r}, {self.callback!r})"
+
+
+class FileWatcher:
+    """Watches files and folders, calling (debounced) callbacks when they change.
+
+    Args:
+        debounce: Seconds to wait after the last event on a path before calling its
+            callbacks.
+        poll_interval: Seconds between two checks, when polling.
+        use_inotify: Use inotify (True), polling (False), or inotify if available
+            (None, the default).
+    """
+
+    def __init__(
+        self,
+        *,
+        debounce: float = DFLT_DEBOUNCE,
+        poll_interval: float = DFLT_POLL_INTERVAL,
+        use_inotify: Optional[bool] = None,
+    ):
+        if use_inotify is None:
+            use_inotify = inotify_available()
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._backend = _InotifyBackend() if use_inotify else _PollingBackend()
+        self._lock = threading.RLock()
+        self._watches: Dict[str, List[Watch]] = {}
+        self._pending: Dict[str, float] = {}  # path -> time its callbacks are due
+        self._wake_event = threading.Event()
+        self._wake_r, self._wake_w = os.pipe() if use_inotify else (None, None)
+        self._thread = None
+        self._stopped = False
+
+    @property
+    def uses_inotify(self) -> bool:
+        return isinstance(self._backend, _InotifyBackend)
+
+    def watch(self, path: PathT, callback: WatchCallback) -> Watch:
+        """Call ``callback(path)`` whenever the file or folder ``path`` changes."""
+        path = os.path.realpath(os.path.expanduser(os.fspath(path)))
+        handle = Watch(self, path, callback)
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError("This watcher was stopped")
+            if path not in self._watches:
+                self._backend.add(path)
+                self._watches[path] = []
+            self._watches[path].append(handle)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="config2py-watcher", daemon=True
+                )
+                self._thread.start()
+        return handle
+
+    def unwatch(self, handle: Watch):
+        """Stop calling ``handle``'s callback."""
+        with self._lock:
+            handles = self._watches.get(handle.path, [])
+            if handle in handles:
+                handles.remove(handle)
+            if not handles and handle.path in self._watches:
+                del self._watches[handle.path]
+                self._pending.pop(handle.path, None)
+                self._backend.remove(handle.path)
+
+    def stop(self):
+        """Stop the watcher thread and release its resources."""
+        with self._lock:
+            self._stopped = True
+        self._wake()
+        if self._thread is not None:
+            self._thread.join()
+        self._backend.close()
+        if self._wake_r is not None:
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+
+    def _wake(self):
+        if self._wake_w is not None:
+            os.write(self._wake_w, b"\0")
+        else:
+            self._wake_event.set()
+
+    def _timeout(self, now, next_poll):
+        deadlines = list(self._pending.values())
+        if not self.uses_inotify:
+            deadlines.append(next_poll)
+        return max(0.0, min(deadlines) - now) if deadlines else None
+
+    def _wait(self, timeout):
+        if self._wake_r is None:
+            self._wake_event.wait(timeout)
+            self._wake_event.clear()
+            return
+        readable, _, _ = select.select(
+            [self._backend.fileno(), self._wake_r], [], [], timeout
+        )
+        if self._wake_r in readable:
+            os.read(self._wake_r, 1024)
+
+    def _run(self):
+        next_poll = time.monotonic() + self.poll_interval
+        while True:
+            with self._lock:
+                if self._stopped:
+                    return
+                timeout = self._timeout(time.monotonic(), next_poll)
+            self._wait(timeout)
+            now = time.monotonic()
+            with self._lock:
+                if self._stopped:
+                    return
+                changed = self._backend.read_changes()
+                if now >= next_poll:
+                    changed |= self._backend.poll_changes()
+                    next_poll = now + self.poll_interval
+                for path in changed:
+                    if path in self._watches:
+                        self._pending[path] = now + self.debounce
+                due = [path for path, t in self._pending.items() if t <= now]
+                to_fire = []
+                for path in due:
+                    del self._pending[path]
+                    to_fire.extend(self._watches.get(path, ()))
+            for handle in to_fire:  # outside the lock: callbacks may (un)watch
+                handle._fire()
+
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def get_watcher() -> FileWatcher:
+    """Get the process-wide watcher (created on first use)."""
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = FileWatcher()
+        return _watcher
+
+
+def watch_path(path: PathT, callback: WatchCallback) -> Watch:
+    """Call ``callback(path)`` (debounced) whenever the file or folder changes.
+
+    Uses the process-wide watcher. Returns a handle whose ``cancel()`` stops the watch.
+    """
+    return get_watcher().watch(path, callback)